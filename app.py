@@ -1,14 +1,21 @@
 ##### app.py #####
 
 import streamlit as st
-from crawler.make_csv import get_groups, get_youtube
-from quest.make_quest import load_data, select_two_groups_random, count_groups_with_min_subscribers, select_groups_with_min_subscribers, search_groups, select_groups_by_search, reselect_group, build_prompt, generate_poll_title, generate_poll_options
-from image.combine import make_image
-from image.upload import upload_image
+from crawler.make_csv import get_groups, get_youtube, pending_youtube_outputs, DEFAULT_CHECKPOINT_FILE
+from sns.refresh import DEFAULT_DAILY_BUDGET
+from store.group_store import GroupStore, DEFAULT_STORE_FILE
+from quest.group_index import GroupIndex
+from quest.make_quest import load_data, build_prompt, generate_poll_title, generate_poll_options
+from image.combine import make_image_variants, make_images
+from image.upload import upload_images, upload_variants
+from image.cache import fetch_image_bytes
+from image.encode import content_type, extension
 from sns.link import link_picker
-from sns.youtube import get_playlist, get_random_track_from_playlist
+from sns.youtube import get_playlist_entry, get_random_track_from_playlist
+from sns.artist_index import ArtistIndex
 from sheets.append_poll import append_new_poll
-from sheets.finder import find_latest_poll_id
+from sheets.finder import find_latest_poll_id, get_poll_history
+from quest.season import plan_season
 from sheets.append_quest import append_new_quests
 import requests
 from PIL import Image
@@ -20,8 +27,13 @@ import altair as alt
 import pandas as pd
 import datetime
 import glob
+import os
 import re
 
+# 투표 이미지 출력 형식과 목표 용량 (PNG 대신 작은 WebP로 올려 투표 페이지 로딩을 줄임)
+BLEND_FORMAT = "webp"
+BLEND_TARGET_BYTES = 150 * 1024
+
 log_placeholder = st.sidebar.empty()
 
 class StreamlitLogger:
@@ -41,6 +53,59 @@ class StreamlitLogger:
     def flush(self):
         pass
 
+def open_store():
+    # 그룹 스냅샷 저장소를 열고, 아직 가져오지 않은 CSV 스냅샷이 있으면 한 번만 가져옵니다.
+    store = GroupStore(DEFAULT_STORE_FILE)
+    for csv_file in glob.glob("groups_data*.csv"):
+        store.import_csv(csv_file)
+    return store
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+def load_snapshot(snapshot, store_path, store_mtime):
+    """
+    스냅샷을 읽어 필터링한 DataFrame을 모든 세션이 함께 쓰도록 캐시합니다.
+    (store_path, store_mtime)이 키에 들어있어 저장소 파일이 바뀌면 다시 읽습니다.
+    반환된 DataFrame은 공유 객체이므로 제자리에서 수정하지 않습니다.
+    """
+    with GroupStore(store_path) as store:
+        return load_data(snapshot, store=store)
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+def load_snapshot_index(snapshot, store_path, store_mtime):
+    # 캐시된 DataFrame에 대한 구독자 정렬 인덱스 (GroupIndex)
+    return GroupIndex(load_snapshot(snapshot, store_path, store_mtime))
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+def load_artist_index(snapshot, store_path, store_mtime):
+    # 플레이리스트 아티스트 → 그룹 매칭용 이름 색인 (ArtistIndex)
+    return ArtistIndex(load_snapshot(snapshot, store_path, store_mtime))
+
+@st.cache_resource(show_spinner=False, max_entries=8)
+def load_playlist_matches(playlist_id, fetched_at, snapshot, store_path, store_mtime, _tracks):
+    """
+    플레이리스트 트랙을 스냅샷 그룹에 미리 매칭한 [(트랙, 행 위치)]를 캐시합니다.
+    트랙 목록은 (playlist_id, fetched_at)으로 구분하므로 새로고침하거나 TTL이 지나면 다시 매칭합니다.
+    제외할 그룹은 여기서 빼지 않고 get_random_track_from_playlist에서 고를 때 뺍니다.
+    """
+    return load_artist_index(snapshot, store_path, store_mtime).match_tracks(_tracks)
+
+def invalidate_loaded_data():
+    # 새 스냅샷을 저장한 뒤 호출해 캐시된 DataFrame과 인덱스를 비웁니다.
+    load_snapshot.clear()
+    load_snapshot_index.clear()
+    load_artist_index.clear()
+    load_playlist_matches.clear()
+
+def make_and_upload_blend(group_A, group_B):
+    """
+    두 그룹의 합성 이미지를 반응형 크기별로 만들어 올립니다.
+    반환: (기본 이미지 바이트, 기본 이미지 URL, {가로: URL}) - 기본 이미지는 가장 큰 크기(1320px)입니다.
+    """
+    variants = make_image_variants(group_A["image"], group_B["image"], fmt=BLEND_FORMAT, target_bytes=BLEND_TARGET_BYTES)
+    variant_urls = upload_variants(variants, f"blended_image{extension(BLEND_FORMAT)}", content_type(BLEND_FORMAT))
+    width = max(variants)
+    return variants[width], variant_urls[width], variant_urls
+
 # 이미지 PIL 객체를 base64 문자열로 변환
 def pil_to_base64(img):
     buffered = BytesIO()
@@ -71,6 +136,7 @@ def initialize_session_state():
         "poll_title": None,
         "poll_options": None,
         "image_url": None,
+        "image_variant_urls": None,
         "manual_input": False,
         "data": None,
         "sns_A": None,
@@ -115,17 +181,28 @@ def display_sidebar():
 
 def group_listup():
     st.subheader("Step 0: 그룹 데이터 업데이트")
-    
+
+    crawl_workers = st.number_input("동시 요청 수 (workers)", min_value=1, max_value=16, value=8, key="crawl_workers")
+    crawl_rate = st.number_input("호스트당 초당 요청 수", min_value=0.5, max_value=20.0, value=5.0, step=0.5, key="crawl_rate")
+    previous_file = None
+    previous_files = sorted(glob.glob("groups_data*.csv"), reverse=True)
+    if previous_files and st.checkbox("증분 업데이트 (변경된 그룹만 다시 가져오기)", key="crawl_incremental"):
+        previous_file = st.selectbox("이전 스냅샷 선택", previous_files, key="crawl_previous_file")
+    resume = False
+    if os.path.exists(DEFAULT_CHECKPOINT_FILE):
+        resume = st.checkbox("중단된 크롤링 이어서 하기 (체크포인트 사용)", value=True, key="crawl_resume")
     if st.button("그룹 데이터 업데이트 실행"):
         date = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
         groups_file_name = f"groups_data_{date}.csv"
-        
-        with st.spinner("그룹 리스트 초기화 중 (groups_data.csv 업데이트)..."):
-            get_groups(output_file=groups_file_name)
+
+        with st.spinner("그룹 리스트 초기화 중 (groups_data.csv 업데이트)..."), open_store() as store:
+            get_groups(output_file=groups_file_name, workers=int(crawl_workers), rate=crawl_rate, previous_file=previous_file, resume=resume, store=store)
+        invalidate_loaded_data()
         st.success("그룹 리스트 초기화 완료.")
         
-        groups_data_df = pd.read_csv(groups_file_name)
-        groups_data_csv = groups_data_df.to_csv(index=False).encode('utf-8-sig')
+        # 저장된 CSV(UTF-8 BOM)를 다시 파싱하지 않고 그대로 내려줍니다.
+        with open(groups_file_name, "rb") as f:
+            groups_data_csv = f.read()
         st.download_button(
             label="그룹 리스트",
             data=groups_data_csv,
@@ -139,16 +216,30 @@ def group_listup():
         selected_input_file = st.selectbox("입력 파일 선택", sorted(csv_files, reverse=True))
         st.session_state.selected_input_file = selected_input_file
         
+    youtube_refresh = st.checkbox("기존 구독자 수도 갱신 (변동성/규모 기반 스케줄)", key="youtube_refresh")
+    youtube_budget = None
+    if youtube_refresh:
+        youtube_budget = st.number_input("일일 API 예산 (unit)", min_value=1, value=DEFAULT_DAILY_BUDGET, step=100, key="youtube_budget")
+
+    resume_file = None
+    pending_outputs = pending_youtube_outputs()
+    if pending_outputs and st.checkbox("중단된 유튜브 업데이트 이어서 하기 (업데이트 로그 사용)", value=True, key="youtube_resume"):
+        # 같은 출력 파일로 다시 실행하면 남은 로그를 먼저 적용하고 처리하지 못한 행부터 이어갑니다.
+        resume_file = st.selectbox("이어서 할 출력 파일", pending_outputs, key="youtube_resume_file")
 
     if st.button("그룹 데이터 유튜브 구독자 업데이트 실행"):
         input_file = st.session_state.selected_input_file
-        with st.spinner("유튜브 구독자 정보 업데이트 중 (groups_data_updated.csv 업데이트)..."):
-            updated_date = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-            updated_file_name = f"groups_data_updated_{updated_date}.csv"
-            get_youtube(input_file=input_file, output_file=updated_file_name)
+        with st.spinner("유튜브 구독자 정보 업데이트 중 (groups_data_updated.csv 업데이트)..."), open_store() as store:
+            if resume_file:
+                updated_file_name = resume_file
+            else:
+                updated_date = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+                updated_file_name = f"groups_data_updated_{updated_date}.csv"
+            get_youtube(input_file=input_file, output_file=updated_file_name, refresh=youtube_refresh, budget=int(youtube_budget) if youtube_budget else None, store=store)
+        invalidate_loaded_data()
         st.success("유튜브 구독자 정보 업데이트 완료.")
-        groups_data_updated_df = pd.read_csv(updated_file_name)
-        groups_data_updated_csv = groups_data_updated_df.to_csv(index=False).encode('utf-8-sig')
+        with open(updated_file_name, "rb") as f:
+            groups_data_updated_csv = f.read()
         st.download_button(
             label="그룹 리스트",
             data=groups_data_updated_csv,
@@ -160,10 +251,14 @@ def group_listup():
 
 def group_selection():
     st.subheader("Step 1: 그룹 선택 방법")
-    csv_files = glob.glob("groups_data_updated*.csv")
-    if csv_files:
-        selected_data = st.selectbox("Data 선택", sorted(csv_files, reverse=True))
-        data = load_data(selected_data)
+    with open_store() as store:
+        snapshots = [snapshot["name"] for snapshot in store.snapshots(kind="updated")]
+    if snapshots:
+        selected_data = st.selectbox("Data 선택", snapshots)
+        store_mtime = os.path.getmtime(DEFAULT_STORE_FILE)
+        data = load_snapshot(selected_data, DEFAULT_STORE_FILE, store_mtime)
+        index = load_snapshot_index(selected_data, DEFAULT_STORE_FILE, store_mtime)
+        artist_index = load_artist_index(selected_data, DEFAULT_STORE_FILE, store_mtime)
         st.session_state.data = data
 
         st.divider()
@@ -177,34 +272,24 @@ def group_selection():
         ####################################
         # 공통 선택 유틸리티 함수 정의
         ####################################
+        # 구독자 수로 정렬된 인덱스 (데이터와 함께 캐시됨)
+        def excluded_names(exclude_group):
+            return [exclude_group['group_name']] if exclude_group is not None else []
+
         def select_random_group(df, exclude_group=None):
-            available = df.copy()
-            if exclude_group is not None:
-                available = available[available['group_name'] != exclude_group['group_name']]
-            return available.sample(n=1).iloc[0]
+            return index.sample(exclude=excluded_names(exclude_group))
 
         def select_by_min_sub(df, min_sub, exclude_group=None):
-            available = df[df['youtube_subscribers'] >= min_sub]
-            if exclude_group is not None:
-                available = available[available['group_name'] != exclude_group['group_name']]
-            if available.empty:
-                return None
-            return available.sample(n=1).iloc[0]
+            return index.sample(low=min_sub, exclude=excluded_names(exclude_group))
 
         def select_by_search(df, keyword, selected_name, exclude_group=None):
-            available = df[df['group_name'].str.contains(keyword, case=False, na=False)]
-            if exclude_group is not None:
-                available = available[available['group_name'] != exclude_group['group_name']]
-            if available.empty or selected_name not in available['group_name'].values:
+            # selected_name은 keyword 검색 결과에서 고른 이름입니다.
+            if selected_name in excluded_names(exclude_group):
                 return None
-            return available[available['group_name'] == selected_name].iloc[0]
+            return index.find(selected_name)
 
         def select_by_playlist(df, tracks, exclude_group=None):
-            available_data = df.copy()
-            if exclude_group is not None:
-                available_data = available_data[available_data['group_name'] != exclude_group['group_name']]
-
-            matched_info = get_random_track_from_playlist(available_data, tracks)
+            matched_info = get_random_track_from_playlist(df, tracks, index=artist_index, exclude=excluded_names(exclude_group), matched=playlist_matches)
             if matched_info is None:
                 raise ValueError("일치하는 그룹을 찾을 수 없습니다.")
             
@@ -215,12 +300,10 @@ def group_selection():
             image_url = st.text_input(f"Group {group_letter} - 아티스트 이미지 URL", key=f"manual_image_url_{group_letter}")
             if image_url:
                 try:
-                    response = requests.get(image_url.split("/scale-to-width-down")[0])
-                    if response.status_code == 200:
-                        img = Image.open(BytesIO(response.content))
-                        st.image(img, width=350)
-                    else:
-                        st.error("이미지를 불러올 수 없습니다.")
+                    img = Image.open(BytesIO(fetch_image_bytes(image_url)))
+                    st.image(img, width=350)
+                except requests.RequestException:
+                    st.error("이미지를 불러올 수 없습니다.")
                 except Exception as e:
                     st.error(f"이미지 로드 중 오류 발생: {str(e)}")
                     
@@ -241,24 +324,14 @@ def group_selection():
 
         # 비슷한 그룹 선택 함수
         def select_similar_group(df, group, threshold=0.5):
-            subscribers = group['youtube_subscribers']
-            range_min = subscribers * (1 - threshold)
-            range_max = subscribers * (1 + threshold)
-            similar_df = df[
-                (df['youtube_subscribers'] >= range_min) &
-                (df['youtube_subscribers'] <= range_max) &
-                (df['group_name'] != group['group_name'])
-            ]
-            if similar_df.empty:
-                df_no_group = df[df['group_name'] != group['group_name']].copy()
-                df_no_group['diff'] = (df_no_group['youtube_subscribers'] - subscribers).abs()
-                similar_df = df_no_group.sort_values(by='diff').head(5)
-            return similar_df.sample(n=1).iloc[0]
+            return index.sample_similar(group['youtube_subscribers'], threshold, exclude=[group['group_name']])
         
         threshold_val = st.slider("유사 그룹 선택 임계값 (0.0 ~ 1.0)", 0.0, 1.0, 0.5, step=0.05)
-        min_sub = st.slider("최소 구독자 수", 0, int(data['youtube_subscribers'].max()), key="min_sub")
+        min_sub = st.slider("최소 구독자 수", 0, int(index.subscribers[-1]), key="min_sub")
         playlist_id = st.text_input("유튜브 플레이리스트 ID", key="playlist_id", value="https://music.youtube.com/playlist?list=PL4fGSI1pDJn5S09aId3dUGp40ygUqmPGc")
-        tracks = get_playlist(playlist_id)
+        refresh_playlist = st.button("플레이리스트 새로고침")
+        playlist_key, fetched_at, tracks = get_playlist_entry(playlist_id, refresh=refresh_playlist)
+        playlist_matches = load_playlist_matches(playlist_key, fetched_at, selected_data, DEFAULT_STORE_FILE, store_mtime, tracks)
         
         st.divider()
 
@@ -299,7 +372,7 @@ def group_selection():
                 if(st.session_state.group_B is not None):
                     st.session_state.group_A = select_similar_group(data, st.session_state.group_B, threshold_val)
                 else:
-                    st.session_state.group_A = data.sample(n=1).iloc[0]
+                    st.session_state.group_A = select_random_group(data)
                 st.success(f"Group A 선택됨: {st.session_state.group_A['group_name']}")
 
             # 2. 최소 구독자 조건 선택 (Group A)
@@ -334,11 +407,10 @@ def group_selection():
 
             if st.session_state.group_A is not None:        
                 current_image_A = st.session_state.group_A["image"]
-                response_A = requests.get(current_image_A.split("/scale-to-width-down")[0])
-                if response_A.status_code == 200:
-                    img_A = Image.open(BytesIO(response_A.content))
+                try:
+                    img_A = Image.open(BytesIO(fetch_image_bytes(current_image_A)))
                     st.image(img_A, width=350)
-                else:
+                except requests.RequestException:
                     st.error("Failed to load image for Group A.")
 
                 new_image_A = st.text_input("Replace Group A Image", key="replace_image_A", value=current_image_A)
@@ -362,7 +434,7 @@ def group_selection():
                 if(st.session_state.group_A is not None):
                     st.session_state.group_B = select_similar_group(data, st.session_state.group_A, threshold_val)
                 else:
-                    st.session_state.group_B = data.sample(n=1).iloc[0]
+                    st.session_state.group_B = select_random_group(data)
                 st.success(f"Group B 선택됨: {st.session_state.group_B['group_name']}")
 
             # 2. 최소 구독자 조건 선택 (Group B)
@@ -397,11 +469,10 @@ def group_selection():
 
             if st.session_state.group_B is not None:
                 current_image_B = st.session_state.group_B["image"]
-                response_B = requests.get(current_image_B.split("/scale-to-width-down")[0])
-                if response_B.status_code == 200:
-                    img_B = Image.open(BytesIO(response_B.content))
+                try:
+                    img_B = Image.open(BytesIO(fetch_image_bytes(current_image_B)))
                     st.image(img_B, width=350)
-                else:
+                except requests.RequestException:
                     st.error("Failed to load image for Group B.")
                 
                 new_image_B = st.text_input("Replace Group B Image", key="replace_image_B", value=current_image_B)
@@ -453,19 +524,19 @@ def ask_to_gpt_step():
             st.write("**Options:**", poll_options)
 
             # 이미지 생성 및 SNS 링크 처리
-            image_path = make_image(group_A["image"], group_B["image"])
-            image_url = upload_image(image_path, "blended_image.png")
+            image_data, image_url, variant_urls = make_and_upload_blend(group_A, group_B)
             st.session_state.image_url = image_url
+            st.session_state.image_variant_urls = variant_urls
             sns_A = link_picker(group_A)
             sns_B = link_picker(group_B)
             st.session_state.sns_A = sns_A
             st.session_state.sns_B = sns_B
 
-            response_blend = requests.get(image_url)
-            if response_blend.status_code == 200:
-                img_blend = Image.open(BytesIO(response_blend.content))
-                st.image(img_blend, width=500)
+            # 업로드한 이미지를 다시 받지 않고 만든 바이트를 그대로 보여줍니다.
+            st.image(image_data, width=500)
             st.write(image_url)
+            # 작은 화면용 크기별 URL (srcset 등에 사용)
+            st.write({f"{width}w": url for width, url in variant_urls.items()})
 
             col1, col2 = st.columns(2)
             with col1:
@@ -494,19 +565,19 @@ def manual_input_step():
                 st.write("**Options:**", poll_options)
 
                 # 이미지 생성 및 SNS 링크 처리
-                image_path = make_image(group_A["image"], group_B["image"])
-                image_url = upload_image(image_path, "blended_image.png")
+                image_data, image_url, variant_urls = make_and_upload_blend(group_A, group_B)
                 st.session_state.image_url = image_url
+                st.session_state.image_variant_urls = variant_urls
                 sns_A = link_picker(group_A)
                 sns_B = link_picker(group_B)
                 st.session_state.sns_A = sns_A
                 st.session_state.sns_B = sns_B
 
-                response_blend = requests.get(image_url)
-                if response_blend.status_code == 200:
-                    img_blend = Image.open(BytesIO(response_blend.content))
-                    st.image(img_blend, width=500)
+                # 업로드한 이미지를 다시 받지 않고 만든 바이트를 그대로 보여줍니다.
+                st.image(image_data, width=500)
                 st.write(image_url)
+                # 작은 화면용 크기별 URL (srcset 등에 사용)
+                st.write({f"{width}w": url for width, url in variant_urls.items()})
                 col1, col2 = st.columns(2)
                 with col1:
                     st.write(f"**SNS Link for {poll_options[0]}:**", sns_A)
@@ -758,6 +829,55 @@ def quest_entries_section():
                 appended_rows = append_new_quests(quests_data)
                 st.success(f"Quests appended at rows: {appended_rows}")
 
+def season_planner_section():
+    st.subheader("시즌 계획 (여러 날짜의 투표 쌍 미리 정하기)")
+    data = st.session_state.get("data")
+    if data is None:
+        return
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        season_days = st.number_input("기간 (일)", min_value=1, max_value=365, value=90, key="season_days")
+    with col2:
+        cooldown_days = st.number_input("같은 그룹 재등장 간격 (일)", min_value=0, max_value=180, value=14, key="season_cooldown")
+    with col3:
+        season_threshold = st.number_input("구독자 차이 허용 비율", min_value=0.01, max_value=1.0, value=0.1, step=0.01, key="season_threshold")
+    if st.button("시즌 계획 만들기"):
+        with st.spinner("Poll List 이력을 불러와 계획을 만드는 중..."):
+            history = get_poll_history()
+            schedule = plan_season(data, history, days=int(season_days), cooldown_days=int(cooldown_days), threshold=season_threshold)
+        st.session_state.season_schedule = pd.DataFrame([
+            {
+                "poll_id": poll["poll_id"],
+                "start": poll["start"],
+                "end": poll["end"],
+                "group_a": poll["group_A"]["group_name"],
+                "group_b": poll["group_B"]["group_name"],
+                "subscribers_a": int(poll["group_A"]["youtube_subscribers"]),
+                "subscribers_b": int(poll["group_B"]["youtube_subscribers"]),
+                "gender": poll["group_A"]["gender"],
+                "image_a": poll["group_A"]["image"],
+                "image_b": poll["group_B"]["image"],
+            }
+            for poll in schedule
+        ])
+    if st.session_state.get("season_schedule") is not None:
+        if st.button("시즌 이미지 일괄 생성 및 업로드"):
+            season_schedule = st.session_state.season_schedule.copy()
+            with st.spinner("투표 이미지를 한 번에 만드는 중..."):
+                # 여러 날짜에 나오는 같은 사진은 한 번만 받아 줄이고, 합성은 여러 프로세스로 나눠 처리합니다.
+                images = make_images(zip(season_schedule["image_a"], season_schedule["image_b"]),
+                                     fmt=BLEND_FORMAT, target_bytes=BLEND_TARGET_BYTES)
+                # 업로드는 UPLOAD_POOL_SIZE개 스레드가 풀의 연결을 나눠 써서 동시에 보냅니다.
+                season_schedule["image_url"] = upload_images(images, f"blended_image{extension(BLEND_FORMAT)}", content_type(BLEND_FORMAT))
+            st.session_state.season_schedule = season_schedule
+        st.dataframe(st.session_state.season_schedule)
+        st.download_button(
+            label="시즌 계획",
+            data=st.session_state.season_schedule.to_csv(index=False).encode('utf-8-sig'),
+            file_name="season_plan.csv",
+            mime="text/csv"
+        )
+
 sys.stdout = StreamlitLogger()
 
 # 메인 함수: 각 단계별 함수들을 순차적으로 호출
@@ -768,6 +888,7 @@ def main():
 
     group_listup()
     group_selection()
+    season_planner_section()
     display_groups()
     build_prompt_step()
     ask_to_gpt_step()
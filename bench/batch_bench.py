@@ -0,0 +1,70 @@
+"""
+여러 투표 쌍의 합성 이미지를 만들 때 make_image를 쌍마다 부르는 방식과 make_images 일괄 처리를 비교합니다.
+사진 --photos장을 로컬 서버에서 내려주고, 각 사진이 여러 쌍에 나오도록 --pairs개의 쌍을 만듭니다.
+이미지 캐시는 미리 채워 두므로 잘라 줄이기/합성/인코딩(CPU) 처리량만 잽니다.
+프로세스 수에 따른 향상은 CPU가 여러 개인 곳에서만 의미가 있습니다. (CPU가 하나면 workers>1은 오히려 느림)
+
+    python -m bench.batch_bench --photos 12 --pairs 28 --format webp
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import threading
+import time
+from http.server import ThreadingHTTPServer
+
+from bench.blend_bench import make_handler, make_photo
+from image.cache import ImageCache
+from image.combine import make_image, make_images
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--photos", type=int, default=12)
+    parser.add_argument("--pairs", type=int, default=28)
+    parser.add_argument("--format", default="webp")
+    parser.add_argument("--workers", default="1,2,4", help="비교할 프로세스 수 (쉼표로 구분)")
+    args = parser.parse_args()
+
+    images = {}
+    for i in range(args.photos):
+        fmt, ext = ("JPEG", "jpg") if i % 2 == 0 else ("WEBP", "webp")
+        images[f"/{i}.{ext}"] = make_photo(1600, 2000, fmt, i)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(images, 0))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    paths = sorted(images)
+    # 한 사진이 여러 쌍에 나오도록 (i, i+1), (i, i+2), ... 순서로 쌍을 만듭니다.
+    pairs = []
+    step = 1
+    while len(pairs) < args.pairs:
+        for i in range(len(paths)):
+            if len(pairs) < args.pairs:
+                pairs.append((f"{base}{paths[i]}", f"{base}{paths[(i + step) % len(paths)]}"))
+        step += 1
+
+    workdir = tempfile.mkdtemp()
+    cache = ImageCache(workdir)
+    for url in images:
+        cache.get(f"{base}{url}")
+
+    start = time.perf_counter()
+    serial = [make_image(a, b, cache=cache, fmt=args.format) for a, b in pairs]
+    serial_time = time.perf_counter() - start
+    print(f"{args.pairs} pairs from {args.photos} photos, format {args.format}, {os.cpu_count()} CPU(s)")
+    if (os.cpu_count() or 1) == 1:
+        print("CPU가 하나뿐이라 workers>1 결과는 프로세스 수에 따른 향상을 보여주지 않습니다.")
+    print(f"make_image x{args.pairs:<3d}        {serial_time:6.2f} s  {args.pairs / serial_time:5.1f} pairs/s")
+
+    for workers in (int(value) for value in args.workers.split(",")):
+        start = time.perf_counter()
+        batch = make_images(pairs, cache=cache, fmt=args.format, workers=workers)
+        batch_time = time.perf_counter() - start
+        assert batch == serial
+        print(f"make_images workers={workers:<2d}   {batch_time:6.2f} s  {args.pairs / batch_time:5.1f} pairs/s  ({serial_time / batch_time:.1f}x)")
+
+    server.shutdown()
+    shutil.rmtree(workdir)
+
+if __name__ == "__main__":
+    main()
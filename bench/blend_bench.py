@@ -0,0 +1,120 @@
+"""
+로컬 서버에서 큰 그룹 사진(JPEG, WebP)을 내려주고 image.combine.make_image의 전체 지연 시간을 비교합니다.
+- baseline: 순차 다운로드 + 원본 크기 RGBA 디코딩 + 호출마다 마스크 생성 + PNG 파일 저장 (기존 방식)
+- parallel: 동시 다운로드 + draft/reducing_gap 축소 디코딩 + 미리 만든 마스크 + 메모리에서 빠른 PNG 압축 (캐시 없이 매번 다운로드)
+- warm: 이미지 캐시에 이미 있는 경우
+
+    python -m bench.blend_bench --repeat 5 --latency 0.15
+"""
+import argparse
+import io
+import shutil
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import requests
+from PIL import Image, ImageOps
+
+from image.cache import ImageCache
+from image.combine import make_image
+
+def make_photo(width, height, fmt, seed):
+    # 사진처럼 부드러운 그라데이션에 잡음을 섞은 이미지를 만듭니다.
+    rng = np.random.default_rng(seed)
+    y, x = np.mgrid[0:height, 0:width]
+    base = np.stack([x * 255 // width, y * 255 // height, (x + y) * 255 // (width + height)], axis=-1)
+    noise = rng.integers(0, 40, size=(height, width, 3))
+    array = np.clip(base + noise, 0, 255).astype(np.uint8)
+    buffer = io.BytesIO()
+    Image.fromarray(array, mode='RGB').save(buffer, fmt, quality=90)
+    return buffer.getvalue()
+
+def make_handler(images, latency):
+    class ImageHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(latency)
+            body = images[self.path.split("/scale-to-width-down")[0]]
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+    return ImageHandler
+
+def baseline_make_image(url_raw_a, url_raw_b, output_path):
+    url_a = url_raw_a.split('/scale-to-width-down/')[0]
+    url_b = url_raw_b.split('/scale-to-width-down/')[0]
+    response_a = requests.get(url_a)
+    response_b = requests.get(url_b)
+    img_a = Image.open(io.BytesIO(response_a.content)).convert('RGBA')
+    img_b = Image.open(io.BytesIO(response_b.content)).convert('RGBA')
+    final_width, final_height = (1320, 660)
+    target_size = (700, final_height)
+    img_a_fit = ImageOps.fit(img_a, target_size, method=Image.Resampling.LANCZOS)
+    img_b_fit = ImageOps.fit(img_b, target_size, method=Image.Resampling.LANCZOS)
+    final_image = Image.new('RGBA', (final_width, final_height))
+    final_image.paste(img_a_fit, (0, 0))
+    mask_array = np.ones((final_height, 700), dtype=np.uint8) * 255
+    gradient = np.linspace(0, 255, 80, dtype=np.uint8)
+    mask_array[:, :80] = np.tile(gradient, (final_height, 1))
+    final_image.paste(img_b_fit, (620, 0), Image.fromarray(mask_array, mode='L'))
+    final_image.save(output_path)
+    return output_path
+
+def best_time(func, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.15, help="요청당 서버 지연(초)")
+    args = parser.parse_args()
+
+    images = {
+        "/a.jpg": make_photo(3000, 4000, "JPEG", 1),
+        "/b.webp": make_photo(2400, 3000, "WEBP", 2),
+    }
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(images, args.latency))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    url_a = f"{base}/a.jpg/scale-to-width-down/350"
+    url_b = f"{base}/b.webp"
+    workdir = tempfile.mkdtemp()
+
+    results = {}
+
+    def parallel_cold():
+        cache_dir = tempfile.mkdtemp(dir=workdir)
+        results["parallel"] = make_image(url_a, url_b, cache=ImageCache(cache_dir))
+
+    warm_cache = ImageCache(f"{workdir}/warm")
+    make_image(url_a, url_b, cache=warm_cache)
+
+    baseline = best_time(lambda: baseline_make_image(url_a, url_b, f"{workdir}/baseline.png"), args.repeat)
+    parallel = best_time(parallel_cold, args.repeat)
+    warm = best_time(lambda: make_image(url_a, url_b, cache=warm_cache), args.repeat)
+    server.shutdown()
+
+    old = np.asarray(Image.open(f"{workdir}/baseline.png"), dtype=np.int16)
+    new = np.asarray(Image.open(io.BytesIO(results["parallel"])), dtype=np.int16)
+    diff = np.abs(old - new).mean()
+    shutil.rmtree(workdir)
+
+    print(f"sources: a.jpg 3000x4000 ({len(images['/a.jpg']) / 1024:.0f} KB), b.webp 2400x3000 ({len(images['/b.webp']) / 1024:.0f} KB), latency {args.latency}s")
+    print(f"baseline        {baseline * 1000:7.0f} ms")
+    print(f"parallel (cold) {parallel * 1000:7.0f} ms  ({baseline / parallel:.1f}x)")
+    print(f"cached (warm)   {warm * 1000:7.0f} ms  ({baseline / warm:.1f}x)")
+    print(f"mean abs pixel difference vs baseline: {diff:.2f} / 255")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+저장된 YouTube 채널 페이지 fixture를 로컬 서버로 내려주고 채널 ID 추출 방식을 비교합니다.
+- full: 페이지 전체를 받은 뒤 BeautifulSoup으로 <link rel="canonical">을 찾음 (기존 방식)
+- stream: sns.youtube.fetch_channel_id로 스트리밍하며 찾는 즉시 연결 종료
+
+    python -m bench.channel_id_bench --repeat 5 --bandwidth 20
+"""
+import argparse
+import glob
+import gzip
+import os
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+from bs4 import BeautifulSoup
+
+from sns.youtube import extract_channel_id_stream, fetch_channel_id, STREAM_CHUNK_SIZE
+
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), "fixtures", "youtube")
+CHANNEL_PATTERN = re.compile(r'/channel/([^/?]+)')
+
+def make_handler(pages, bandwidth):
+    class FixtureHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            body = pages[self.path.strip("/")]
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            # bandwidth(MB/s)에 맞춰 조금씩 보내 실제 다운로드처럼 시간이 걸리게 합니다.
+            chunk = 16 * 1024
+            try:
+                for i in range(0, len(body), chunk):
+                    self.wfile.write(body[i:i + chunk])
+                    time.sleep(chunk / (bandwidth * 1024 * 1024))
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+
+        def log_message(self, *args):
+            pass
+    return FixtureHandler
+
+def full_parse(session, url):
+    response = session.get(url, timeout=10)
+    soup = BeautifulSoup(response.text, 'html.parser')
+    canonical_link = soup.find("link", rel="canonical")
+    channel_id = None
+    if canonical_link and 'href' in canonical_link.attrs:
+        match = CHANNEL_PATTERN.search(canonical_link['href'])
+        if match:
+            channel_id = match.group(1)
+    return channel_id, len(response.content)
+
+def stream_bytes(session, url):
+    consumed = [0]
+    def counting(chunks):
+        for chunk in chunks:
+            consumed[0] += len(chunk)
+            yield chunk
+    with session.get(url, timeout=10, stream=True) as response:
+        extract_channel_id_stream(counting(response.iter_content(chunk_size=STREAM_CHUNK_SIZE)))
+    return consumed[0]
+
+def best_time(func, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--bandwidth", type=float, default=20.0, help="MB/s")
+    args = parser.parse_args()
+
+    pages = {}
+    for path in sorted(glob.glob(os.path.join(FIXTURE_DIR, "*.html.gz"))):
+        with gzip.open(path, "rb") as f:
+            pages[os.path.basename(path)[:-len(".html.gz")]] = f.read()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(pages, args.bandwidth))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    session = requests.Session()
+
+    for name in pages:
+        url = f"{base}/{name}"
+        full_time, (full_id, full_size) = best_time(lambda: full_parse(session, url), args.repeat)
+        stream_time, stream_id = best_time(lambda: fetch_channel_id(url, session=session), args.repeat)
+        consumed = stream_bytes(session, url)
+        # meta identifier는 기존 방식이 찾지 못하던 경우라 ID가 달라도 됩니다.
+        same = "same id" if full_id == stream_id else f"full={full_id} stream={stream_id}"
+        print(f"{name:<16} full {full_time * 1000:7.1f} ms {full_size / 1024:6.0f} KB | "
+              f"stream {stream_time * 1000:6.1f} ms {consumed / 1024:6.0f} KB | {same}")
+    server.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+로컬 스텁 HTTP 서버를 띄워 crawler.make_csv.get_data의 순차/동시 크롤링 시간을 비교합니다.
+
+    python -m bench.crawl_bench --groups 100 --latency 0.05 --workers 8
+"""
+import argparse
+import contextlib
+import io
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from crawler.make_csv import get_data
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html><head><title>{name} | Kpop Wiki | Fandom</title></head>
+<body>
+<aside class="portable-infobox pi-background pi-theme-wikia pi-layout-default">
+  <h2 class="pi-item pi-title" data-source="name">{name}</h2>
+  <figure class="pi-item pi-image" data-source="image">
+    <img src="https://static.wikia.nocookie.net/kpop/images/{idx}.png/revision/latest/scale-to-width-down/268?cb=2025010100000{idx}">
+  </figure>
+  <div class="pi-item pi-data" data-source="hangul"><h3>Hangul</h3><div class="pi-data-value">그룹{idx}</div></div>
+  <div class="pi-item pi-data" data-source="debut"><h3>Debut</h3><div class="pi-data-value">January {idx}, 2020</div></div>
+  <div class="pi-item pi-data" data-source="current"><h3>Current</h3><div class="pi-data-value"><ul><li>A{idx}</li><li>B{idx}</li></ul></div></div>
+  <div class="pi-item pi-data" data-source="sns"><h3>SNS</h3><div class="pi-data-value"><a href="https://www.youtube.com/@group{idx}">YouTube</a></div></div>
+</aside>
+<p>{body}</p>
+</body></html>
+"""
+
+def make_handler(latency):
+    class StubHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(latency)
+            idx = self.path.rsplit("_", 1)[-1]
+            body = PAGE_TEMPLATE.format(name=f"Group {idx}", idx=idx, body="lorem ipsum " * 2000).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+    return StubHandler
+
+def run(groups, **kwargs):
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        results = get_data(groups, **kwargs)
+    return time.perf_counter() - start, results
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--groups", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--rate", type=float, default=100.0)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(args.latency))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    groups = [
+        {"group_name": f"Group {i} (band)", "link": f"{base}/wiki/Group_{i}", "type": "group", "gender": "male"}
+        for i in range(args.groups)
+    ]
+
+    seq_time, seq_rows = run(groups)
+    par_time, par_rows = run(groups, workers=args.workers, rate=args.rate)
+    server.shutdown()
+
+    assert seq_rows == par_rows, "순차/동시 결과가 다릅니다."
+    print(f"groups={args.groups} latency={args.latency}s")
+    print(f"sequential (workers=1, random sleep): {seq_time:.2f}s")
+    print(f"concurrent (workers={args.workers}, rate={args.rate}/s): {par_time:.2f}s")
+    print(f"speedup: {seq_time / par_time:.1f}x, rows identical: {len(par_rows)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+합성 이미지를 형식별로 인코딩해 용량과 인코딩 시간을 비교합니다.
+입력은 저장소의 blended_image.png(실제 합성 결과, 1320x660 RGBA)입니다.
+- png (기존): RGBA, 기본 압축 수준
+- 형식별 기본 품질, target_bytes 상한 탐색, 반응형 크기(1320/660/330)를 한 번에 만드는 경우
+
+    python -m bench.encode_bench --target-kb 40 --repeat 3
+"""
+import argparse
+import time
+from io import BytesIO
+
+from PIL import Image
+
+from image.encode import FORMATS, RESPONSIVE_WIDTHS, check_format, encode, encode_variants
+
+def best_time(func, repeat):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+def report(name, seconds, size, baseline_size):
+    print(f"{name:28s} {size / 1024:8.1f} KB  ({size / baseline_size * 100:5.1f}%)  {seconds * 1000:7.1f} ms")
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--input", default="blended_image.png")
+    parser.add_argument("--target-kb", type=int, default=40)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    image = Image.open(args.input)
+    image.load()
+    target_bytes = args.target_kb * 1024
+
+    def save_png_default():
+        buffer = BytesIO()
+        image.save(buffer, 'PNG')
+        return buffer.getvalue()
+
+    seconds, data = best_time(save_png_default, args.repeat)
+    baseline_size = len(data)
+    print(f"input {args.input} {image.size[0]}x{image.size[1]} {image.mode}, target {args.target_kb} KB")
+    report("png (old, level 6)", seconds, baseline_size, baseline_size)
+
+    for fmt in FORMATS:
+        try:
+            check_format(fmt)
+        except ValueError as e:
+            print(f"{fmt:28s} skipped: {e}")
+            continue
+        seconds, data = best_time(lambda: encode(image, fmt), args.repeat)
+        report(f"{fmt} (default quality)", seconds, len(data), baseline_size)
+        if fmt == 'png':
+            continue
+        seconds, data = best_time(lambda: encode(image, fmt, target_bytes=target_bytes), args.repeat)
+        report(f"{fmt} (≤{args.target_kb} KB)", seconds, len(data), baseline_size)
+        seconds, variants = best_time(lambda: encode_variants(image, fmt, target_bytes=target_bytes), args.repeat)
+        sizes = ", ".join(f"{width}px {len(variants[width]) / 1024:.0f} KB" for width in RESPONSIVE_WIDTHS if width in variants)
+        print(f"{fmt + ' responsive':28s} {seconds * 1000:7.1f} ms  {sizes}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+그룹 수를 늘려가며 유사 그룹 선택 시간을 비교합니다.
+- scan: DataFrame 전체를 불리언 마스크로 거르고, 후보가 없으면 diff로 정렬 (기존 방식)
+- index: quest.group_index.GroupIndex의 searchsorted 범위/최근접 검색
+
+    python -m bench.group_index_bench --sizes 1000 10000 100000 1000000 --queries 200
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from quest.group_index import GroupIndex
+
+def make_roster(size, rng):
+    # 구독자 수는 실제 분포처럼 로그 정규분포로 만듭니다.
+    subscribers = np.round(rng.lognormal(mean=11, sigma=2, size=size)).astype(int) + 1
+    return pd.DataFrame({
+        "group_name": [f"Group {i}" for i in range(size)],
+        "youtube_subscribers": subscribers,
+    })
+
+def scan_similar(df, group, threshold):
+    subscribers = group['youtube_subscribers']
+    range_min = subscribers * (1 - threshold)
+    range_max = subscribers * (1 + threshold)
+    similar_df = df[
+        (df['youtube_subscribers'] >= range_min) &
+        (df['youtube_subscribers'] <= range_max) &
+        (df['group_name'] != group['group_name'])
+    ]
+    if similar_df.empty:
+        df_no_group = df[df['group_name'] != group['group_name']].copy()
+        df_no_group['diff'] = (df_no_group['youtube_subscribers'] - subscribers).abs()
+        similar_df = df_no_group.sort_values(by='diff').head(5)
+    return similar_df.sample(n=1).iloc[0]
+
+def per_call(func, groups):
+    start = time.perf_counter()
+    for group in groups:
+        func(group)
+    return (time.perf_counter() - start) / len(groups)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000, 1000000])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--threshold", type=float, default=0.01)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    for size in args.sizes:
+        df = make_roster(size, rng)
+        groups = [df.iloc[i] for i in rng.integers(0, size, args.queries)]
+        start = time.perf_counter()
+        index = GroupIndex(df, seed=0)
+        build = time.perf_counter() - start
+
+        # 결과가 기존 방식의 후보 범위 안에 있는지 확인합니다.
+        for group in groups[:20]:
+            picked = index.sample_similar(group['youtube_subscribers'], args.threshold, exclude=[group['group_name']])
+            assert picked['group_name'] != group['group_name']
+            low, high = group['youtube_subscribers'] * (1 - args.threshold), group['youtube_subscribers'] * (1 + args.threshold)
+            in_window = ((df['youtube_subscribers'] >= low) & (df['youtube_subscribers'] <= high)).sum() > 1
+            assert not in_window or low <= picked['youtube_subscribers'] <= high
+
+        scan_queries = groups[:max(1, args.queries // 10)] if size >= 100000 else groups
+        scan_time = per_call(lambda g: scan_similar(df, g, args.threshold), scan_queries)
+        index_time = per_call(
+            lambda g: index.sample_similar(g['youtube_subscribers'], args.threshold, exclude=[g['group_name']]), groups
+        )
+        print(f"groups={size:>8}  scan {scan_time * 1e3:8.3f} ms/call  index {index_time * 1e3:6.3f} ms/call  "
+              f"(build {build * 1e3:.0f} ms, {scan_time / index_time:.0f}x)")
+
+if __name__ == "__main__":
+    main()
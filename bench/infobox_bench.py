@@ -0,0 +1,48 @@
+"""
+저장된 fandom 페이지 fixture로 infobox 파싱 속도를 비교하고 결과가 같은지 확인합니다.
+- full: 페이지 전체를 html.parser로 파싱 (기존 방식)
+- fast: aside.portable-infobox 구간만 잘라 그 하위 트리만 파싱
+
+    python -m bench.infobox_bench --repeat 20
+"""
+import argparse
+import glob
+import gzip
+import os
+import time
+
+from crawler.get_data import parse_individual_data
+
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), "fixtures", "fandom")
+
+def timeit(func, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    total_full = total_fast = 0.0
+    for path in sorted(glob.glob(os.path.join(FIXTURE_DIR, "*.html.gz"))):
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            html = f.read()
+        full = parse_individual_data(html, fast=False)
+        fast = parse_individual_data(html, fast=True)
+        assert full == fast, f"{path}: 결과가 다릅니다.\n{full}\n{fast}"
+
+        full_time = timeit(lambda: parse_individual_data(html, fast=False), args.repeat)
+        fast_time = timeit(lambda: parse_individual_data(html, fast=True), args.repeat)
+        total_full += full_time
+        total_fast += fast_time
+        name = os.path.basename(path)
+        print(f"{name:<20} {len(html) / 1024:7.0f} KB  full {full_time * 1000:7.1f} ms  fast {fast_time * 1000:6.1f} ms  ({full_time / fast_time:.1f}x)")
+    print(f"{'total':<20} {'':>10}  full {total_full * 1000:7.1f} ms  fast {total_fast * 1000:6.1f} ms  ({total_full / total_fast:.1f}x), outputs identical")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""
+로컬 가짜 GCS 서버(토큰 발급 + 업로드)로 image.upload.upload_image의 업로드당 지연 시간을 비교합니다.
+- baseline: 호출마다 서비스 계정 파싱, 토큰 발급, storage.Client 생성 (기존 방식)
+- pooled: 프로세스에서 한 번 만든 버킷/세션 재사용 (토큰과 연결 재사용), 매번 새 이미지
+- repeat (manifest): 같은 이미지를 다시 올릴 때 로컬 기록에서 바로 URL 반환
+- repeat (no manifest): 로컬 기록이 없는 곳(다른 서버)에서 같은 이미지를 올릴 때 조건부 업로드가 거절됨
+
+    python -m bench.upload_bench --uploads 20 --latency 0.05
+"""
+import argparse
+import contextlib
+import datetime
+import io
+import json
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import rsa
+from google.cloud import storage
+from google.oauth2 import service_account
+
+from image import upload
+
+def make_service_account(token_uri):
+    # requirements.txt에 있는 rsa 패키지로 임시 키를 만듭니다. (PKCS#1 PEM도 google-auth가 읽을 수 있음)
+    _, key = rsa.newkeys(2048)
+    pem = key.save_pkcs1()
+    return {
+        "type": "service_account",
+        "project_id": "bench-project",
+        "private_key_id": "bench",
+        "private_key": pem.decode(),
+        "client_email": "bench@bench-project.iam.gserviceaccount.com",
+        "client_id": "1",
+        "token_uri": token_uri,
+    }
+
+def make_handler(stats, latency):
+    class FakeGCSHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # 헤더와 본문을 따로 쓰므로 Nagle 지연(40ms)이 재사용 연결에만 붙지 않도록 끕니다.
+        disable_nagle_algorithm = True
+
+        def setup(self):
+            super().setup()
+            with stats["lock"]:
+                stats["connections"] += 1
+
+        def do_GET(self):
+            # 클라이언트가 버킷마다 한 번 조회하는 버킷 메타데이터
+            time.sleep(latency)
+            with stats["lock"]:
+                stats["metadata"] += 1
+            self.send_json({"name": upload.BUCKET_NAME, "location": "US"})
+
+        def do_POST(self):
+            time.sleep(latency)
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            if self.path.startswith("/token"):
+                with stats["lock"]:
+                    stats["tokens"] += 1
+                payload = {"access_token": "bench-token", "expires_in": 3600, "token_type": "Bearer"}
+            else:
+                # multipart 업로드의 첫 부분(JSON 메타데이터)에서 객체 이름을 읽습니다.
+                name = re.search(rb'"name": "([^"]+)"', body).group(1).decode()
+                with stats["lock"]:
+                    if "ifGenerationMatch=0" in self.path and name in stats["objects"]:
+                        stats["conflicts"] += 1
+                        self.send_json({"error": {"code": 412, "message": "Precondition Failed"}}, status=412)
+                        return
+                    stats["uploads"] += 1
+                    stats["objects"].add(name)
+                payload = {"bucket": upload.BUCKET_NAME, "name": name, "size": str(len(body)), "generation": "1"}
+            self.send_json(payload)
+
+        def send_json(self, payload, status=200):
+            data = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *args):
+            pass
+    return FakeGCSHandler
+
+def baseline_upload_image(image_data, destination_blob_name):
+    google_service_account_info = json.loads(os.environ['GOOGLE_SERVICE_ACCOUNT'])
+    credentials = service_account.Credentials.from_service_account_info(google_service_account_info)
+    client = storage.Client(credentials=credentials, project=credentials.project_id)
+    bucket = client.bucket(upload.BUCKET_NAME)
+    timestamp = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
+    base, ext = os.path.splitext(destination_blob_name)
+    blob = bucket.blob(f'{base}_{timestamp}{ext}')
+    blob.upload_from_string(image_data, content_type='image/png')
+
+def measure(func, uploads, make_data, stats):
+    for key in ("connections", "tokens", "metadata", "conflicts", "uploads"):
+        stats[key] = 0
+    times = []
+    for _ in range(uploads):
+        image_data = make_data()
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            func(image_data, "blended_image.png")
+        times.append(time.perf_counter() - start)
+    times.sort()
+    return times[len(times) // 2], sum(times) / len(times), dict(stats)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--uploads", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.05, help="요청당 서버 지연(초)")
+    parser.add_argument("--size", type=int, default=1024 * 1024, help="업로드할 바이트 수")
+    args = parser.parse_args()
+
+    stats = {"lock": threading.Lock(), "objects": set(), "connections": 0, "tokens": 0, "metadata": 0, "conflicts": 0, "uploads": 0}
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(stats, args.latency))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    os.environ["STORAGE_EMULATOR_HOST"] = base
+    os.environ["GOOGLE_SERVICE_ACCOUNT"] = json.dumps(make_service_account(f"{base}/token"))
+    workdir = tempfile.mkdtemp()
+    manifest_path = os.path.join(workdir, "manifest.json")
+    new_image = lambda: os.urandom(args.size)
+    same_image = new_image()
+
+    def fresh_manifest_upload(image_data, name):
+        # 매번 빈 기록으로 시작해 버킷에 이미 있는 경우만 측정합니다.
+        return upload.upload_image(image_data, name, manifest_path=tempfile.mktemp(dir=workdir))
+
+    upload.reset_bucket()
+    with contextlib.redirect_stdout(io.StringIO()):
+        upload.upload_image(same_image, "blended_image.png", manifest_path=manifest_path)
+    results = [
+        ("baseline", measure(baseline_upload_image, args.uploads, new_image, stats)),
+        ("pooled", measure(lambda data, name: upload.upload_image(data, name, manifest_path=manifest_path), args.uploads, new_image, stats)),
+        ("repeat (manifest)", measure(lambda data, name: upload.upload_image(data, name, manifest_path=manifest_path), args.uploads, lambda: same_image, stats)),
+        ("repeat (no manifest)", measure(fresh_manifest_upload, args.uploads, lambda: same_image, stats)),
+    ]
+    server.shutdown()
+    shutil.rmtree(workdir)
+
+    print(f"{args.uploads} uploads of {args.size / 1024:.0f} KB, latency {args.latency}s per request")
+    baseline_median = results[0][1][0]
+    for name, (median, mean, counts) in results:
+        print(f"{name:20s} median {median * 1000:6.1f} ms  mean {mean * 1000:6.1f} ms  ({baseline_median / max(median, 1e-6):.0f}x)  "
+              f"connections {counts['connections']}, tokens {counts['tokens']}, bucket lookups {counts['metadata']}, "
+              f"rejected {counts['conflicts']}, uploads {counts['uploads']}")
+
+if __name__ == "__main__":
+    main()
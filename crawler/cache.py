@@ -0,0 +1,138 @@
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+
+DEFAULT_CACHE_DIR = ".http_cache"
+
+class CachedResponse:
+    """
+    캐시에서 꺼낸 응답을 requests.Response처럼 쓸 수 있도록 감싼 객체입니다.
+    (status_code, text, headers만 제공)
+    """
+    def __init__(self, text, headers=None, status_code=200):
+        self.status_code = status_code
+        self.text = text
+        self.headers = headers or {}
+        self.from_cache = True
+
+class ResponseCache:
+    """
+    URL별 응답 본문을 디스크에 저장하는 캐시입니다.
+    - ttl(초) 이내의 항목은 네트워크 요청 없이 그대로 사용합니다.
+    - ttl이 지난 항목은 ETag/Last-Modified로 조건부 요청을 보내 304면 재사용합니다.
+    - max_age(초) 동안 갱신되지 않은 항목과, 전체 크기가 max_bytes를 넘을 때
+      가장 오래 사용하지 않은 항목부터 evict()에서 삭제합니다.
+    """
+    def __init__(self, directory=DEFAULT_CACHE_DIR, ttl=6 * 3600, max_age=30 * 24 * 3600, max_bytes=512 * 1024 * 1024):
+        self.directory = directory
+        self.ttl = ttl
+        self.max_age = max_age
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _paths(self, url):
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        base = os.path.join(self.directory, key[:2], key)
+        return base + ".json", base + ".html.gz"
+
+    def _write_meta(self, meta_path, meta):
+        tmp_path = f"{meta_path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, meta_path)
+
+    def lookup(self, url):
+        meta_path, _ = self._paths(url)
+        try:
+            with open(meta_path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def is_fresh(self, meta):
+        return time.time() - meta.get("fetched_at", 0) < self.ttl
+
+    def conditional_headers(self, meta):
+        headers = {}
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+        return headers
+
+    def load(self, url, meta):
+        _, body_path = self._paths(url)
+        try:
+            with gzip.open(body_path, "rt", encoding="utf-8") as f:
+                text = f.read()
+        except (OSError, EOFError):
+            return None
+        meta["accessed_at"] = time.time()
+        self._write_meta(self._paths(url)[0], meta)
+        return CachedResponse(text, headers={"ETag": meta.get("etag", ""), "Last-Modified": meta.get("last_modified", "")})
+
+    def store(self, url, response):
+        meta_path, body_path = self._paths(url)
+        os.makedirs(os.path.dirname(meta_path), exist_ok=True)
+        tmp_path = f"{body_path}.{threading.get_ident()}.tmp"
+        with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+            f.write(response.text)
+        os.replace(tmp_path, body_path)
+        now = time.time()
+        self._write_meta(meta_path, {
+            "url": url,
+            "etag": response.headers.get("ETag", ""),
+            "last_modified": response.headers.get("Last-Modified", ""),
+            "fetched_at": now,
+            "accessed_at": now,
+            "size": os.path.getsize(body_path)
+        })
+
+    def revalidated(self, url, meta, response):
+        # 304 응답: 본문은 그대로 두고 검증 시각과 새 검증자만 갱신합니다.
+        meta["fetched_at"] = time.time()
+        meta["etag"] = response.headers.get("ETag", meta.get("etag", ""))
+        meta["last_modified"] = response.headers.get("Last-Modified", meta.get("last_modified", ""))
+        return self.load(url, meta)
+
+    def evict(self):
+        with self.lock:
+            now = time.time()
+            entries = []
+            removed = 0
+            for root, _, files in os.walk(self.directory):
+                for name in files:
+                    if not name.endswith(".json"):
+                        continue
+                    meta_path = os.path.join(root, name)
+                    body_path = meta_path[:-len(".json")] + ".html.gz"
+                    try:
+                        with open(meta_path, encoding="utf-8") as f:
+                            meta = json.load(f)
+                    except (OSError, ValueError):
+                        meta = {}
+                    if not meta or now - meta.get("fetched_at", 0) > self.max_age:
+                        self._remove(meta_path, body_path)
+                        removed += 1
+                        continue
+                    entries.append((meta.get("accessed_at", 0), meta.get("size", 0), meta_path, body_path))
+
+            total = sum(size for _, size, _, _ in entries)
+            for _, size, meta_path, body_path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                self._remove(meta_path, body_path)
+                total -= size
+                removed += 1
+            return removed
+
+    def _remove(self, meta_path, body_path):
+        for path in (meta_path, body_path):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
@@ -0,0 +1,105 @@
+import random
+import threading
+import time
+from urllib.parse import urlparse
+import requests
+
+class TokenBucket:
+    """
+    초당 rate개씩 토큰을 채우고 최대 capacity개까지 모아두는 토큰 버킷입니다.
+    acquire()는 토큰이 하나 생길 때까지 대기한 뒤 소비합니다.
+    """
+    def __init__(self, rate, capacity=None):
+        if rate <= 0:
+            raise ValueError("rate는 0보다 커야 합니다.")
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+class HostRateLimiter:
+    """
+    호스트(netloc)마다 별도의 토큰 버킷을 두어 요청 속도를 제한합니다.
+    """
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity
+        self.buckets = {}
+        self.lock = threading.Lock()
+
+    def acquire(self, url):
+        host = urlparse(url).netloc
+        with self.lock:
+            bucket = self.buckets.get(host)
+            if bucket is None:
+                bucket = TokenBucket(self.rate, self.capacity)
+                self.buckets[host] = bucket
+        bucket.acquire()
+
+class RandomDelay:
+    """
+    순차 크롤링용: 네트워크 요청 직전에 min_delay~max_delay초 사이에서 랜덤하게 대기합니다.
+    HostRateLimiter와 같은 acquire(url) 인터페이스를 가집니다.
+    """
+    def __init__(self, min_delay=0.01, max_delay=0.6):
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+
+    def acquire(self, url):
+        time.sleep(random.uniform(self.min_delay, self.max_delay))
+
+_local = threading.local()
+
+def get_session():
+    # requests.Session은 스레드 간 공유가 안전하지 않으므로 스레드마다 하나씩 재사용합니다.
+    session = getattr(_local, "session", None)
+    if session is None:
+        session = requests.Session()
+        _local.session = session
+    return session
+
+def send_request(url, headers, timeout, rate_limiter):
+    # 모든 실제 요청은 여기로 보내 호스트별 속도 제한을 항상 먼저 거칩니다.
+    if rate_limiter is not None:
+        rate_limiter.acquire(url)
+    return get_session().get(url, headers=headers, timeout=timeout)
+
+def fetch(url, headers=None, timeout=30, rate_limiter=None, cache=None):
+    """
+    URL을 GET으로 가져옵니다.
+    cache(ResponseCache)가 주어지면 신선한 캐시는 그대로 돌려주고,
+    오래된 캐시는 조건부 요청(ETag/Last-Modified)으로 재검증합니다.
+    """
+    meta = cache.lookup(url) if cache is not None else None
+    if meta is not None:
+        if cache.is_fresh(meta):
+            cached = cache.load(url, meta)
+            if cached is not None:
+                return cached
+        headers = {**(headers or {}), **cache.conditional_headers(meta)}
+
+    response = send_request(url, headers, timeout, rate_limiter)
+
+    if cache is not None:
+        if response.status_code == 304 and meta is not None:
+            cached = cache.revalidated(url, meta, response)
+            if cached is not None:
+                return cached
+            # 본문 파일이 사라진 경우 조건 없이 다시 받습니다.
+            response = send_request(url, {k: v for k, v in headers.items() if not k.startswith("If-")}, timeout, rate_limiter)
+        if response.status_code == 200:
+            cache.store(url, response)
+    return response
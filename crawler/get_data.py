@@ -1,8 +1,32 @@
 ##### crawler\get_data.py #####
 
-import requests
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
 import re
+from crawler.fetch import fetch
+
+REVISION_PATTERN = re.compile(r'"wgCurRevisionId":(\d+)')
+# 페이지 전체 대신 infobox(aside.portable-infobox) 하위 트리만 DOM으로 만듭니다.
+# 파싱 단계에서는 class 속성이 공백으로 이어진 문자열이라 정규식으로 단어 단위 비교를 합니다.
+INFOBOX_STRAINER = SoupStrainer("aside", class_=re.compile(r"(?:^|\s)portable-infobox(?:\s|$)"))
+# INFOBOX_STRAINER와 같이 공백으로 구분된 클래스 이름 전체를 비교합니다. (portable-infobox-foo는 제외)
+INFOBOX_START = re.compile(r"""<aside\b[^>]*\bclass=["'](?:[^"']*\s)?portable-infobox(?=[\s"'])""", re.IGNORECASE)
+ASIDE_TAG = re.compile(r"<(/?)aside\b", re.IGNORECASE)
+
+def infobox_fragment(html):
+    """
+    HTML 문자열에서 첫 번째 infobox <aside>...</aside> 구간만 잘라 반환합니다.
+    찾지 못하면 None을 반환합니다.
+    """
+    match = INFOBOX_START.search(html)
+    if not match:
+        return None
+    depth = 0
+    for tag in ASIDE_TAG.finditer(html, match.start()):
+        depth += -1 if tag.group(1) else 1
+        if depth == 0:
+            end = html.find(">", tag.end())
+            return html[match.start():end + 1] if end != -1 else None
+    return None
 
 def extract_value(container):
     """
@@ -25,12 +49,12 @@ def extract_links(container):
         return []
     return [a.get("href") for a in container.find_all("a") if a.get("href")]
 
-def get_individual_data(link):
+def get_individual_data(link, rate_limiter=None, cache=None):
     headers = {
         "User-Agent": "Mozilla/5.0"
     }
     try:
-        response = requests.get(link, headers=headers)
+        response = fetch(link, headers=headers, rate_limiter=rate_limiter, cache=cache)
     except Exception as e:
         print(f"Error fetching {link}: {e}")
         return None
@@ -39,7 +63,22 @@ def get_individual_data(link):
         print(f"Failed to fetch {link}: status {response.status_code}")
         return None
 
-    soup = BeautifulSoup(response.text, 'html.parser')
+    return parse_individual_data(response.text)
+
+def parse_individual_data(html, fast=True):
+    """
+    그룹 페이지 HTML에서 infobox 데이터를 추출합니다.
+    fast=True면 infobox 구간만 잘라 그 하위 트리만 파싱하고,
+    fast=False면 기존처럼 페이지 전체를 파싱합니다. 두 결과는 동일합니다.
+    """
+    if fast:
+        fragment = infobox_fragment(html)
+        soup = BeautifulSoup(fragment if fragment is not None else html, 'html.parser', parse_only=INFOBOX_STRAINER)
+        if fragment is not None and not soup.find("aside", class_="portable-infobox"):
+            # 잘라낸 구간에서 infobox를 찾지 못하면 페이지 전체에서 다시 찾습니다.
+            soup = BeautifulSoup(html, 'html.parser', parse_only=INFOBOX_STRAINER)
+    else:
+        soup = BeautifulSoup(html, 'html.parser')
     
     # 데이터 기본값 설정 (찾지 못하는 경우 빈 값으로 남김)
     data = {
@@ -62,8 +101,14 @@ def get_individual_data(link):
         "fandom": "",
         "colors": "",
         "related": "",
-        "other_names": ""
+        "other_names": "",
+        "revision_id": ""
     }
+
+    # 페이지 메타데이터(RLCONF)의 현재 리비전 번호: 증분 크롤링에서 변경 여부 판단에 사용
+    revision_match = REVISION_PATTERN.search(html)
+    if revision_match:
+        data["revision_id"] = int(revision_match.group(1))
     
     # infobox 찾기
     infobox = soup.find("aside", class_="portable-infobox")
@@ -1,8 +1,8 @@
 ##### crawler\boy_group_crawler.py #####
-import requests
 from bs4 import BeautifulSoup
+from crawler.fetch import fetch
 
-def groups_from_urls(urls, gender = "male"):
+def groups_from_urls(urls, gender = "male", cache=None):
     headers = {
         "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/115.0.0.0 Safari/537.36"
     }
@@ -10,7 +10,7 @@ def groups_from_urls(urls, gender = "male"):
     
     for url in urls:
         print("Processing URL:", url)
-        response = requests.get(url, headers=headers)
+        response = fetch(url, headers=headers, cache=cache)
         if response.status_code != 200:
             print("페이지를 불러오지 못했습니다. 상태 코드:", response.status_code)
             continue
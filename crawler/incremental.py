@@ -0,0 +1,126 @@
+import re
+from datetime import datetime
+from urllib.parse import unquote, urlencode, urlparse
+import pandas as pd
+from crawler.fetch import fetch
+
+# MediaWiki API는 한 번에 최대 50개의 제목을 조회할 수 있습니다.
+TITLES_PER_REQUEST = 50
+CB_PATTERN = re.compile(r"[?&]cb=(\d{14})")
+
+def link_to_title(link):
+    path = urlparse(link).path
+    if "/wiki/" not in path:
+        return None
+    return unquote(path.split("/wiki/", 1)[1]).replace("_", " ")
+
+def fetch_revisions(links, rate_limiter=None):
+    """
+    그룹 페이지 링크별 최신 리비전 정보를 MediaWiki API로 조회합니다.
+    반환값: {link: {"revid": int, "timestamp": "YYYYMMDDHHMMSS"}}
+    조회에 실패한 링크는 결과에 포함되지 않습니다.
+    """
+    headers = {"User-Agent": "Mozilla/5.0"}
+    by_api = {}
+    for link in links:
+        title = link_to_title(link)
+        if not title:
+            continue
+        parsed = urlparse(link)
+        api_url = f"{parsed.scheme}://{parsed.netloc}/api.php"
+        by_api.setdefault(api_url, {})[title] = link
+
+    revisions = {}
+    for api_url, title_to_link in by_api.items():
+        titles = list(title_to_link)
+        for i in range(0, len(titles), TITLES_PER_REQUEST):
+            chunk = titles[i:i + TITLES_PER_REQUEST]
+            params = urlencode({
+                "action": "query",
+                "format": "json",
+                "formatversion": 2,
+                "prop": "revisions",
+                "rvprop": "ids|timestamp",
+                "titles": "|".join(chunk)
+            })
+            url = f"{api_url}?{params}"
+            try:
+                response = fetch(url, headers=headers, rate_limiter=rate_limiter)
+                if response.status_code != 200:
+                    print(f"리비전 조회 실패: status {response.status_code}")
+                    continue
+                query = response.json().get("query", {})
+            except Exception as e:
+                print(f"리비전 조회 중 오류 발생: {e}")
+                continue
+
+            # 요청한 제목이 정규화된 경우(예: 첫 글자 대문자화) 원래 제목으로 되돌립니다.
+            normalized = {n["to"]: n["from"] for n in query.get("normalized", [])}
+            for page in query.get("pages", []):
+                revs = page.get("revisions")
+                if not revs:
+                    continue
+                title = normalized.get(page.get("title"), page.get("title"))
+                link = title_to_link.get(title)
+                if link is None:
+                    continue
+                timestamp = datetime.strptime(revs[0]["timestamp"], "%Y-%m-%dT%H:%M:%SZ")
+                revisions[link] = {"revid": revs[0]["revid"], "timestamp": timestamp.strftime("%Y%m%d%H%M%S")}
+    return revisions
+
+def needs_refresh(previous_row, revision):
+    """
+    이전 스냅샷의 행과 현재 리비전을 비교해 다시 크롤링해야 하는지 판단합니다.
+    - revision_id가 저장된 행: 리비전 번호가 달라졌으면 갱신
+    - revision_id가 없는 예전 행: 이미지 URL의 cb= 값(업로드 시각)보다 이후에 편집되었으면 갱신
+    """
+    if revision is None:
+        return True
+    previous_revid = pd.to_numeric(previous_row.get("revision_id"), errors="coerce")
+    if pd.notna(previous_revid):
+        return int(previous_revid) != revision["revid"]
+    image = previous_row.get("image")
+    match = CB_PATTERN.search(image) if isinstance(image, str) else None
+    if not match:
+        return True
+    return revision["timestamp"] > match.group(1)
+
+def plan_incremental(groups, previous_df, revisions):
+    """
+    카테고리 목록(groups)과 이전 스냅샷을 비교해
+    (새로 가져올 그룹 목록, 그대로 재사용할 {link: 이전 행}) 을 반환합니다.
+    """
+    previous_by_link = {}
+    for row in previous_df.to_dict("records"):
+        previous_by_link.setdefault(row["link"], row)
+
+    to_fetch = []
+    unchanged = {}
+    for group in groups:
+        link = group["link"]
+        previous_row = previous_by_link.get(link)
+        revision = revisions.get(link)
+        if previous_row is None or needs_refresh(previous_row, revision):
+            to_fetch.append(group)
+        else:
+            row = dict(previous_row)
+            row["revision_id"] = revision["revid"]
+            row["type"] = group.get("type", row.get("type", ""))
+            row["gender"] = group.get("gender", row.get("gender", ""))
+            unchanged[link] = row
+    return to_fetch, unchanged
+
+def merge_snapshot(groups, fetched_rows, unchanged):
+    """
+    카테고리 목록 순서대로 새로 가져온 행과 재사용 행을 합칩니다.
+    목록에서 사라진 그룹은 새 스냅샷에서 제외됩니다.
+    """
+    fetched_by_link = {row["link"]: row for row in fetched_rows}
+    merged = []
+    for group in groups:
+        link = group["link"]
+        if link in fetched_by_link:
+            merged.append(fetched_by_link[link])
+        elif link in unchanged:
+            merged.append(unchanged[link])
+    return merged
@@ -0,0 +1,79 @@
+import json
+import os
+import time
+
+class Journal:
+    """
+    JSON Lines 형식의 추가 전용(append-only) 로그입니다.
+    - append()한 레코드는 flush_every개마다, 또는 마지막 확정 후 flush_interval초가
+      지나면 fsync되어 디스크에 확정됩니다.
+    - 비정상 종료로 마지막 줄이 잘린 경우 read()는 그 줄을 무시하고,
+      다음 append()는 잘린 부분을 잘라낸 뒤 이어서 씁니다.
+    """
+    def __init__(self, path, flush_every=10, flush_interval=None):
+        self.path = path
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self.pending = 0
+        self.flushed_at = time.monotonic()
+        self.file = None
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    def read(self):
+        records = []
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                for line in f:
+                    if not line.endswith("\n"):
+                        break
+                    try:
+                        records.append(json.loads(line))
+                    except ValueError:
+                        break
+        except FileNotFoundError:
+            pass
+        return records
+
+    def _open(self):
+        if os.path.exists(self.path):
+            with open(self.path, "rb+") as f:
+                data = f.read()
+                if data and not data.endswith(b"\n"):
+                    f.truncate(data.rfind(b"\n") + 1)
+        self.file = open(self.path, "a", encoding="utf-8")
+
+    def append(self, record):
+        if self.file is None:
+            self._open()
+        self.file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self.pending += 1
+        if self.pending >= self.flush_every:
+            self.flush()
+        elif self.flush_interval is not None and time.monotonic() - self.flushed_at >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        if self.file is not None and self.pending:
+            self.file.flush()
+            os.fsync(self.file.fileno())
+            self.pending = 0
+        self.flushed_at = time.monotonic()
+
+    def close(self):
+        if self.file is not None:
+            self.flush()
+            self.file.close()
+            self.file = None
+
+    def remove(self):
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -3,43 +3,96 @@
 import pandas as pd
 from crawler.group_crawler import groups_from_urls
 from crawler.get_data import get_individual_data
-import random
-import time
+from crawler.fetch import HostRateLimiter, RandomDelay
+from crawler.cache import ResponseCache, DEFAULT_CACHE_DIR
+from crawler.incremental import fetch_revisions, plan_incremental, merge_snapshot
+from crawler.journal import Journal
+from store.serialize import read_csv, write_csv, write_csv_atomic
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# 동시 크롤링 시 호스트당 기본 초당 요청 수
+DEFAULT_RATE = 5.0
+# 그룹 크롤링 체크포인트 로그 (출력 파일명과 무관하게 다음 실행에서 이어받을 수 있도록 고정)
+DEFAULT_CHECKPOINT_FILE = "groups_crawl.checkpoint.jsonl"
+
+def fetch_group(group, rate_limiter=None, cache=None):
+    print(f"\n\n========================================\n\n")
+    link = group["link"]
+    group_name = group["group_name"].split(" (")[0]
+    print(f"그룹 '{group_name}'의 데이터를 가져옵니다... \n({link})")
+    data = get_individual_data(link, rate_limiter=rate_limiter, cache=cache)
+    if data is None:
+        return None
+
+    data["name"] = group_name
+    print(f"그룹 '{group_name}'의 데이터를 가져왔습니다.")
+    data["group_name"] = group_name
+    data["link"] = link
+    data["type"] = group.get("type", "")
+    data["gender"] = group.get("gender", "")
+    print(f"\n\n========================================\n\n")
+    return data
+
+def get_data(groups, batch_size=10, workers=1, rate=None, cache=None, checkpoint_file=None, resume=False):
+    """
+    그룹별 상세 데이터를 수집합니다.
+    - workers가 1이면 기존처럼 순차 처리하며, rate가 없으면 네트워크 요청 전에 랜덤 대기합니다.
+    - workers가 2 이상이면 스레드 풀로 동시에 처리하고, 호스트당 초당 rate개(기본 DEFAULT_RATE)로 요청을 제한합니다.
+    결과 행의 내용과 순서는 두 방식이 동일합니다.
+    cache(ResponseCache)가 주어지면 캐시 적중 시 요청과 대기를 생략합니다.
+    checkpoint_file이 주어지면 가져온 그룹을 링크 단위로 추가 전용 로그에 기록하고
+    batch_size개마다 디스크에 확정합니다. resume=True면 로그에 있는 링크는 다시 가져오지 않습니다.
+    """
+    if workers > 1 and rate is None:
+        rate = DEFAULT_RATE
+    rate_limiter = HostRateLimiter(rate) if rate else RandomDelay(0.01, 0.6)
+
+    journal = Journal(checkpoint_file, flush_every=batch_size) if checkpoint_file else None
+    fetched = {}
+    if journal is not None:
+        if resume:
+            fetched = {record["link"]: record["data"] for record in journal.read()}
+            print(f"체크포인트에서 {len(fetched)}개 그룹을 불러왔습니다. 나머지만 가져옵니다.")
+        else:
+            journal.remove()
+
+    pending = []
+    seen = set(fetched)
+    for group in groups:
+        if group["link"] not in seen:
+            seen.add(group["link"])
+            pending.append(group)
+
+    def process(group):
+        return fetch_group(group, rate_limiter, cache)
+
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            futures = [executor.submit(process, group) for group in pending]
+            # 끝나는 대로 체크포인트에 기록하고, 출력 순서는 아래에서 groups 순서로 맞춥니다.
+            for future in as_completed(futures):
+                data = future.result()
+                if data is None:
+                    continue
+                fetched[data["link"]] = data
+                if journal is not None:
+                    journal.append({"link": data["link"], "data": data})
+    finally:
+        if journal is not None:
+            journal.close()
 
-def get_data(groups, output_file="groups_data.csv", batch_size=10):
     results = []
-    batch_count = 0
     for group in groups:
-        print(f"\n\n========================================\n\n")
-        link = group["link"]
-        group_name = group["group_name"].split(" (")[0]
-        print(f"그룹 '{group_name}'의 데이터를 가져옵니다... \n({link})")
-        data = get_individual_data(link)
+        data = fetched.get(group["link"])
         if data is None:
             continue
-        
-        data["name"] = group_name
-        print(f"그룹 '{group_name}'의 데이터를 가져왔습니다.")
-        data["group_name"] = group_name
-        data["link"] = link
-        data["type"] = group.get("type", "")
-        data["gender"] = group.get("gender", "")
-        print(f"\n\n========================================\n\n")
-        
-        results.append(data)
-        time.sleep(random.uniform(0.01, 0.6))
-        
-        batch_count += 1
-        if batch_count == batch_size:
-            df_batch = pd.DataFrame(results)
-            hashable_cols = ['group_name', 'link', 'gender', 'image']
-            df_batch.drop_duplicates(subset=hashable_cols)
-            df_batch.to_csv(output_file, index=False, encoding="utf-8-sig")
-            batch_count = 0
-
+        row = dict(data)
+        row["type"] = group.get("type", "")
+        row["gender"] = group.get("gender", "")
+        results.append(row)
     return results
 
-def get_groups(output_file="groups_data.csv"):
+def list_groups(cache=None):
     print(f"\n\n========================================\n\n")
     print("그룹 목록을 가져옵니다...")
     boys_urls = [
@@ -71,7 +124,7 @@ def get_groups(output_file="groups_data.csv"):
         "https://kpop.fandom.com/wiki/Category:Male_groups?from=Y",
         "https://kpop.fandom.com/wiki/Category:Male_groups?from=Z"
     ]
-    boygroups = groups_from_urls(boys_urls, "male")
+    boygroups = groups_from_urls(boys_urls, "male", cache=cache)
     print(f"총 {len(boygroups)}개의 남자 그룹을 찾았습니다.")
     
     girls_urls = [
@@ -103,17 +156,41 @@ def get_groups(output_file="groups_data.csv"):
         "https://kpop.fandom.com/wiki/Category:Female_groups?from=Y",
         "https://kpop.fandom.com/wiki/Category:Female_groups?from=Z"
     ]
-    girlgroups = groups_from_urls(girls_urls, "female")
+    girlgroups = groups_from_urls(girls_urls, "female", cache=cache)
     print(f"총 {len(girlgroups)}개의 여자 그룹을 찾았습니다.")
     
-    groups = boygroups + girlgroups
+    return boygroups + girlgroups
+
+def get_groups(output_file="groups_data.csv", workers=1, rate=None, cache_dir=DEFAULT_CACHE_DIR, previous_file=None, checkpoint_file=DEFAULT_CHECKPOINT_FILE, resume=False, store=None):
+    """
+    그룹 목록과 개별 데이터를 크롤링해 output_file로 저장합니다.
+    previous_file이 주어지면 증분 모드로 동작합니다: 이전 스냅샷에 없거나
+    위키 페이지 리비전이 바뀐 그룹만 다시 가져오고 나머지 행은 그대로 합칩니다.
+    resume=True면 이전 실행이 중단된 체크포인트에서 이어서 가져옵니다.
+    CSV는 모든 그룹을 가져온 뒤 한 번만 저장하며, 저장에 성공하면 체크포인트를 삭제합니다.
+    store(GroupStore)가 주어지면 같은 이름의 스냅샷으로도 저장합니다.
+    """
+    cache = ResponseCache(cache_dir) if cache_dir else None
+    if cache is not None and previous_file:
+        # 증분 모드에서는 목록/페이지 변경을 놓치지 않도록 캐시 항목을 항상 재검증합니다.
+        cache.ttl = 0
+    groups = list_groups(cache)
     if not groups:
         print("그룹 목록을 찾지 못했습니다.")
         return
 
     print(f"\n\n========================================\n\n")
     print(f"총 {len(groups)}개의 그룹을 찾았습니다. 개별 데이터를 추출합니다...")
-    data_list = get_data(groups, output_file)
+    if previous_file:
+        previous_df = read_csv(previous_file)
+        known_links = set(previous_df["link"])
+        revisions = fetch_revisions([g["link"] for g in groups if g["link"] in known_links])
+        to_fetch, unchanged = plan_incremental(groups, previous_df, revisions)
+        print(f"증분 모드: {len(to_fetch)}개 그룹을 새로 가져오고 {len(unchanged)}개 그룹은 이전 데이터를 사용합니다.")
+        fetched = get_data(to_fetch, workers=workers, rate=rate, cache=cache, checkpoint_file=checkpoint_file, resume=resume)
+        data_list = merge_snapshot(groups, fetched, unchanged)
+    else:
+        data_list = get_data(groups, workers=workers, rate=rate, cache=cache, checkpoint_file=checkpoint_file, resume=resume)
     
     # DataFrame으로 변환
     df = pd.DataFrame(data_list)
@@ -123,27 +200,81 @@ def get_groups(output_file="groups_data.csv"):
     print(df.head())
     
     # CSV 파일로 저장 (UTF-8 BOM 포함)
-    df.to_csv(output_file, index=False, encoding="utf-8-sig")
+    write_csv(df, output_file)
     print(f"데이터가 {output_file} 파일로 저장되었습니다.")
+    if store is not None:
+        store.save_snapshot(df, os.path.basename(output_file))
+    if checkpoint_file:
+        Journal(checkpoint_file).remove()
+
+    if cache is not None:
+        removed = cache.evict()
+        print(f"HTTP 캐시 정리: {removed}개 항목을 삭제했습니다.")
     
-from sns.youtube import get_youtube_channel_ids, get_youtube_stats_batch
+from sns.youtube import get_youtube_channel_ids, get_youtube_stats_batch, QuotaTracker, ChannelIdCache, CHANNEL_CACHE_FILE, QUOTA_USAGE_FILE
+from sns.refresh import plan_refresh, update_refresh_state, REFRESH_COLUMNS, CHECKED_AT_COLUMN, VOLATILITY_COLUMN, NEXT_REFRESH_COLUMN
+import time
 import pandas as pd
-import ast
 from googleapiclient.discovery import build
+import glob
 import os
 from dotenv import load_dotenv
 
 load_dotenv()
 
-def get_youtube(input_file="groups_data.csv", output_file="groups_data_updated.csv"):    
+# get_youtube가 output_file 옆에 남기는 행 단위 업데이트 로그의 접미사
+YOUTUBE_JOURNAL_SUFFIX = ".journal.jsonl"
+
+def youtube_journal_path(output_file):
+    return f"{output_file}{YOUTUBE_JOURNAL_SUFFIX}"
+
+def pending_youtube_outputs(pattern="groups_data*.csv"):
+    """
+    중단되어 업데이트 로그만 남은 get_youtube 실행의 output_file 목록을 반환합니다.
+    같은 output_file로 get_youtube를 다시 실행하면 로그를 적용하고 남은 행부터 이어서 처리합니다.
+    """
+    return sorted(
+        (path[:-len(YOUTUBE_JOURNAL_SUFFIX)] for path in glob.glob(pattern + YOUTUBE_JOURNAL_SUFFIX)),
+        reverse=True,
+    )
+
+def replay_youtube_journal(df, journal):
+    """
+    이전 실행이 중단되며 남긴 행 단위 업데이트 로그를 df에 다시 적용합니다.
+    같은 행인지 link로 확인하고, 적용한 레코드 수를 반환합니다.
+    """
+    applied = 0
+    for record in journal.read():
+        idx = record["idx"]
+        if idx not in df.index or df.at[idx, "link"] != record["link"]:
+            continue
+        df.at[idx, "youtube_data"] = record["youtube_data"]
+        df.at[idx, "youtube_subscribers"] = record["youtube_subscribers"]
+        df.at[idx, "group_name"] = record["group_name"]
+        for col in REFRESH_COLUMNS:
+            if col in record:
+                df.at[idx, col] = record[col]
+        applied += 1
+    return applied
+
+def get_youtube(input_file="groups_data.csv", output_file="groups_data_updated.csv", refresh=False, budget=None, store=None):
+    """
+    그룹별 YouTube 구독자 수를 채웁니다.
+    refresh=True이면 비어있는 행뿐 아니라 다음 갱신 시각이 지난 행도 우선순위 순으로 다시 조회하며,
+    budget(일일 API unit)이 주어지면 오늘 이미 쓴 사용량(QUOTA_USAGE_FILE)을 뺀 나머지 안에서만 요청합니다.
+    store(GroupStore)가 주어지면 결과를 output_file 이름의 스냅샷으로도 저장합니다.
+    """
     API_KEY = os.getenv("API_KEY")
     youtube = build("youtube", "v3", developerKey=API_KEY)
+    quota = QuotaTracker(daily_limit=budget, usage_file=QUOTA_USAGE_FILE)
+    if budget is not None:
+        print(f"오늘 API 사용량 {quota.used} unit, 남은 예산 {quota.remaining} unit")
     
     # 1. CSV 데이터 불러오기
     print("1. CSV 파일을 불러옵니다...")
-    df = pd.read_csv(input_file)
+    df = read_csv(input_file)
     try:
-        updated_df = pd.read_csv(output_file)
+        updated_df = read_csv(output_file)
         if not updated_df.empty:
             df = updated_df
     except Exception:
@@ -153,19 +284,22 @@ def get_youtube(input_file="groups_data.csv", output_file="groups_data_updated.c
     print(f"1. 총 {len(df)}개의 행을 불러왔습니다.")
     # 1-1. 필요한 컬럼이 없으면 생성 (이미 처리된 데이터인지 확인하기 위해)
     print("1.1. 필요한 컬럼이 없으면 생성합니다...")
-    for col in ["youtube_data", "youtube_subscribers", "youtube_videos"]:
+    for col in ["youtube_data", "youtube_subscribers", "youtube_videos"] + REFRESH_COLUMNS:
         if col not in df.columns:
             df[col] = None
     print("1.1. 필요한 컬럼이 모두 생성되었습니다.")
 
-    # 2. 'sns' 컬럼에서 리스트 데이터 추출 (문자열이면 ast.literal_eval 사용)
+    # 1-2. 중단된 이전 실행의 업데이트 로그가 있으면 다시 적용 (이미 처리한 행은 건너뛰게 됨)
+    journal = Journal(youtube_journal_path(output_file), flush_every=50, flush_interval=5)
+    if journal.exists():
+        applied = replay_youtube_journal(df, journal)
+        print(f"1.2. 업데이트 로그에서 {applied}개 행을 복구했습니다.")
+
+    # 2. 'sns' 컬럼에서 리스트 데이터 추출 (read_csv가 JSON 컬럼을 이미 리스트로 읽음)
     print(f"\n\n========================================\n\n")
     print("2. sns 컬럼을 파싱합니다...")
     def parse_sns(sns_value):
-        try:
-            return ast.literal_eval(sns_value) if isinstance(sns_value, str) else sns_value
-        except Exception:
-            return []
+        return sns_value if isinstance(sns_value, list) else []
     df["sns_parsed"] = df["sns"].apply(parse_sns)
     print("2. sns 컬럼 파싱이 완료되었습니다.")
 
@@ -182,14 +316,24 @@ def get_youtube(input_file="groups_data.csv", output_file="groups_data_updated.c
     df["youtube_link"] = df["sns_parsed"].apply(extract_youtube_link)
     print("3. youtube 링크 추출이 완료되었습니다.")
 
-    # 4. 처리할 행 필터링 (youtube_subscribers가 비어있거나 0인 경우)
+    # 4. 처리할 행 필터링 (youtube_subscribers가 비어있거나 0인 경우, refresh면 갱신 시각이 지난 행 포함)
     print(f"\n\n========================================\n\n")
     print("4. 처리할 행을 필터링합니다...")
     df["youtube_subscribers"] = pd.to_numeric(df["youtube_subscribers"], errors='coerce')
-    to_process = df[df["youtube_subscribers"].isna() | (df["youtube_subscribers"] == 0)]
+    for col in REFRESH_COLUMNS:
+        df[col] = pd.to_numeric(df[col], errors='coerce')
+    if refresh:
+        channel_cache = ChannelIdCache(CHANNEL_CACHE_FILE)
+        needs_lookup = lambda link: "/channel/" not in link and not channel_cache.get(link)[0]
+        to_process = df.loc[plan_refresh(df, budget=quota.remaining, needs_lookup=needs_lookup)]
+    else:
+        to_process = df[df["youtube_subscribers"].isna() | (df["youtube_subscribers"] == 0)]
 
     if to_process.empty:
         print("4. 모든 행이 이미 처리되었습니다.")
+        if journal.exists():
+            write_csv_atomic(df, output_file)
+            journal.remove()
         return
     print(f"4. 총 {len(to_process)}개의 행을 처리할 예정입니다.")
 
@@ -197,22 +341,29 @@ def get_youtube(input_file="groups_data.csv", output_file="groups_data_updated.c
     print(f"\n\n========================================\n\n")
     print("5. 채널 ID를 조회합니다...")
     youtube_links = to_process["youtube_link"].tolist()
-    channel_ids_mapping = get_youtube_channel_ids(youtube_links)
-    print("5. 채널 ID 조회가 완료되었습니다.")
+    try:
+        channel_ids_mapping = get_youtube_channel_ids(youtube_links, youtube=youtube, quota=quota)
+        print("5. 채널 ID 조회가 완료되었습니다.")
 
-    # 6. 배치 처리로 통계 정보 조회
-    print(f"\n\n========================================\n\n")
-    print("6. 통계 정보를 조회합니다...")
-    # 유효한 채널 ID만 추출
-    valid_channel_ids = [cid for cid in channel_ids_mapping.values() if cid]
-    stats_mapping = get_youtube_stats_batch(youtube, valid_channel_ids)
-    print("6. 통계 정보 조회가 완료되었습니다.")
+        # 6. 배치 처리로 통계 정보 조회
+        print(f"\n\n========================================\n\n")
+        print("6. 통계 정보를 조회합니다...")
+        # 유효한 채널 ID만 추출
+        valid_channel_ids = [cid for cid in channel_ids_mapping.values() if cid]
+        stats_mapping = get_youtube_stats_batch(youtube, valid_channel_ids, quota=quota)
+    finally:
+        # 중간에 실패해도 이미 쓴 사용량은 기록해 다음 실행의 예산에서 뺍니다.
+        quota.save()
+    print(f"6. 통계 정보 조회가 완료되었습니다. (오늘 API 사용량 {quota.used} unit)")
 
     # 7. DataFrame 업데이트
     print(f"\n\n========================================\n\n")
     print("7. DataFrame을 업데이트합니다...")
+    now = time.time()
     for idx in to_process.index:
         link = df.at[idx, "youtube_link"]
+        prev_subscribers = df.at[idx, "youtube_subscribers"]
+        stats = None
         if not link:
             data = {"subscribers": 0, "viewCount": 0, "videoCount": 0}
         else:
@@ -223,14 +374,25 @@ def get_youtube(input_file="groups_data.csv", output_file="groups_data_updated.c
             if not channel_id:
                 data = {"subscribers": 0, "viewCount": 0, "videoCount": 0}
             else:
-                stats = stats_mapping.get(channel_id, {"subscriberCount": 0, "viewCount": 0, "videoCount": 0})
+                stats = stats_mapping.get(channel_id)
                 data = {
-                    "subscribers": stats.get("subscriberCount", 0),
-                    "viewCount": stats.get("viewCount", 0),
-                    "videoCount": stats.get("videoCount", 0)
+                    "subscribers": (stats or {}).get("subscriberCount", 0),
+                    "viewCount": (stats or {}).get("viewCount", 0),
+                    "videoCount": (stats or {}).get("videoCount", 0)
                 }
-        df.at[idx, "youtube_data"] = str(data)
+        # 이미 값이 있는 행은 조회에 실패(할당량 초과 등)했을 때 0으로 덮어쓰지 않습니다.
+        if stats is None and prev_subscribers > 0:
+            print(f"Row {idx} skipped: 통계 조회 실패, 기존 값을 유지합니다.")
+            continue
+        df.at[idx, "youtube_data"] = data
         df.at[idx, "youtube_subscribers"] = data.get("subscribers", 0)
+        volatility, next_refresh = update_refresh_state(
+            prev_subscribers, df.at[idx, CHECKED_AT_COLUMN], df.at[idx, VOLATILITY_COLUMN],
+            data.get("subscribers", 0), now
+        )
+        df.at[idx, CHECKED_AT_COLUMN] = now
+        df.at[idx, VOLATILITY_COLUMN] = volatility
+        df.at[idx, NEXT_REFRESH_COLUMN] = next_refresh
 
 
         # 그룹 이름이 "("를 포함하면 split하여 첫 부분만 사용
@@ -239,10 +401,25 @@ def get_youtube(input_file="groups_data.csv", output_file="groups_data_updated.c
             processed_name = group_name.split(" (")[0]
             df.at[idx, "group_name"] = processed_name
 
-        # 중간 결과를 CSV에 저장 (실패 시에도 저장)
-        df.to_csv(output_file, index=False, encoding="utf-8-sig")
+        # 행 단위 변경만 로그에 추가 (실패 시 다음 실행에서 1-2 단계로 복구)
+        journal.append({
+            "idx": int(idx),
+            "link": df.at[idx, "link"],
+            "youtube_data": df.at[idx, "youtube_data"],
+            "youtube_subscribers": int(df.at[idx, "youtube_subscribers"]),
+            "group_name": df.at[idx, "group_name"],
+            CHECKED_AT_COLUMN: now,
+            VOLATILITY_COLUMN: None if pd.isna(volatility) else float(volatility),
+            NEXT_REFRESH_COLUMN: next_refresh
+        })
         print(f"Row {idx} processed: {df.at[idx, 'group_name']}")
 
+    # 전체 CSV는 마지막에 한 번만 원자적으로 저장하고, 저장이 끝나면 로그를 지웁니다.
+    journal.close()
+    write_csv_atomic(df, output_file)
+    journal.remove()
+    if store is not None:
+        store.save_snapshot(df, os.path.basename(output_file))
     print("Processing complete.")
 
 def main():
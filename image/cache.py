@@ -0,0 +1,152 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+
+import requests
+
+# 그룹 사진 캐시 디렉터리 (objects/에 내용 해시 이름으로 저장)
+DEFAULT_IMAGE_CACHE_DIR = ".image_cache"
+
+# fandom 이미지 URL의 크기 조정 경로 (/scale-to-width-down/268)
+SCALE_SEGMENT = re.compile(r"/scale-to-width-down/\d+")
+
+def normalize_image_url(url):
+    """
+    fandom 이미지 URL에서 크기 조정 경로(/scale-to-width-down/<n>)만 떼어 원본 URL로 만듭니다.
+    ?cb=<시각> 같은 쿼리는 남겨 두므로 위키에서 사진이 바뀌면 캐시 키도 바뀝니다.
+    """
+    return SCALE_SEGMENT.sub("", url.strip())
+
+class ImageCache:
+    """
+    이미지 바이트를 내용 해시(sha256)로 저장하는 캐시입니다.
+    - 정규화한 URL → 해시 매핑은 urls.json에, 바이트는 objects/<해시 앞 2자리>/<해시>에 둡니다.
+      같은 사진이 여러 URL로 올라와 있어도 디스크에는 한 번만 저장됩니다.
+    - 최근에 쓴 이미지는 memory_bytes 한도 안에서 메모리(LRU)에도 둡니다.
+    - 디스크 사용량이 max_bytes를 넘으면 가장 오래 쓰지 않은 항목부터 지웁니다.
+    """
+    def __init__(self, directory=DEFAULT_IMAGE_CACHE_DIR, max_bytes=256 * 1024 * 1024, memory_bytes=64 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.memory_bytes = memory_bytes
+        self.index_path = os.path.join(directory, "urls.json")
+        self.lock = threading.Lock()
+        self.memory = OrderedDict()
+        self.memory_size = 0
+        os.makedirs(os.path.join(directory, "objects"), exist_ok=True)
+        try:
+            with open(self.index_path, encoding="utf-8") as f:
+                self.urls = json.load(f)
+        except (OSError, ValueError):
+            self.urls = {}
+
+    def _object_path(self, digest):
+        return os.path.join(self.directory, "objects", digest[:2], digest)
+
+    def _remember(self, digest, data):
+        if digest in self.memory:
+            self.memory.move_to_end(digest)
+            return
+        self.memory[digest] = data
+        self.memory_size += len(data)
+        while self.memory_size > self.memory_bytes and len(self.memory) > 1:
+            _, old = self.memory.popitem(last=False)
+            self.memory_size -= len(old)
+
+    def _save_index(self):
+        tmp_path = f"{self.index_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.urls, f, ensure_ascii=False)
+        os.replace(tmp_path, self.index_path)
+
+    def lookup(self, url):
+        """캐시에 있으면 이미지 바이트를, 없으면 None을 반환합니다."""
+        key = normalize_image_url(url)
+        with self.lock:
+            entry = self.urls.get(key)
+            if entry is None:
+                return None
+            digest = entry["sha256"]
+            entry["used"] = time.time()
+            data = self.memory.get(digest)
+            if data is not None:
+                self.memory.move_to_end(digest)
+                return data
+        try:
+            with open(self._object_path(digest), "rb") as f:
+                data = f.read()
+        except OSError:
+            with self.lock:
+                self.urls.pop(key, None)
+            return None
+        with self.lock:
+            self._remember(digest, data)
+        return data
+
+    def store(self, url, data):
+        key = normalize_image_url(url)
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._object_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        with self.lock:
+            self.urls[key] = {"sha256": digest, "size": len(data), "used": time.time()}
+            self._remember(digest, data)
+            self._evict()
+            self._save_index()
+        return digest
+
+    def _evict(self):
+        # 해시별 크기와 마지막 사용 시각을 모아 오래된 것부터 지웁니다. (lock을 잡은 상태에서 호출)
+        objects = {}
+        for entry in self.urls.values():
+            size, used = objects.get(entry["sha256"], (entry["size"], 0))
+            objects[entry["sha256"]] = (size, max(used, entry.get("used", 0)))
+        total = sum(size for size, _ in objects.values())
+        if total <= self.max_bytes:
+            return
+        removed = set()
+        for digest, (size, _) in sorted(objects.items(), key=lambda item: item[1][1]):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(self._object_path(digest))
+            except OSError:
+                pass
+            if digest in self.memory:
+                self.memory_size -= len(self.memory.pop(digest))
+            removed.add(digest)
+            total -= size
+        self.urls = {key: entry for key, entry in self.urls.items() if entry["sha256"] not in removed}
+
+    def get(self, url, timeout=30, session=None):
+        """이미지 바이트를 반환합니다. 캐시에 없으면 원본 URL에서 받아 저장합니다."""
+        data = self.lookup(url)
+        if data is not None:
+            return data
+        response = (session or requests).get(normalize_image_url(url), timeout=timeout)
+        response.raise_for_status()
+        self.store(url, response.content)
+        return response.content
+
+_shared_cache = None
+_shared_lock = threading.Lock()
+
+def get_image_cache():
+    # 앱 전체(모든 세션)에서 하나의 캐시를 공유합니다.
+    global _shared_cache
+    with _shared_lock:
+        if _shared_cache is None:
+            _shared_cache = ImageCache()
+        return _shared_cache
+
+def fetch_image_bytes(url, timeout=30):
+    return get_image_cache().get(url, timeout=timeout)
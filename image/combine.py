@@ -1,28 +1,143 @@
-
-import requests
+import os
 from io import BytesIO
-from PIL import Image, ImageOps
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from PIL import Image
 import numpy as np
+import requests
+from image.cache import get_image_cache, normalize_image_url
+from image.encode import RESPONSIVE_WIDTHS, encode, encode_variants
+
+FINAL_SIZE = (1320, 660)
+TARGET_SIZE = (700, 660)
+PASTE_X = 620
+GRADIENT_WIDTH = 80
+
+def build_mask():
+    # B 이미지 왼쪽 80px을 0→255로 서서히 드러내는 마스크 (한 번만 만들어 재사용)
+    mask_array = np.ones((TARGET_SIZE[1], TARGET_SIZE[0]), dtype=np.uint8) * 255
+    gradient = np.linspace(0, 255, GRADIENT_WIDTH, dtype=np.uint8)
+    mask_array[:, :GRADIENT_WIDTH] = np.tile(gradient, (TARGET_SIZE[1], 1))
+    return Image.fromarray(mask_array, mode='L')
 
-def make_image(url_raw_a, url_raw_b):
-    url_a = url_raw_a.split('/scale-to-width-down/')[0]
-    url_b = url_raw_b.split('/scale-to-width-down/')[0]
-    response_a = requests.get(url_a)
-    response_b = requests.get(url_b)
-    img_a = Image.open(BytesIO(response_a.content)).convert('RGBA')
-    img_b = Image.open(BytesIO(response_b.content)).convert('RGBA')
-    final_width, final_height = (1320, 660)
-    target_size = (700, final_height)
-    img_a_fit = ImageOps.fit(img_a, target_size, method=Image.Resampling.LANCZOS)
-    img_b_fit = ImageOps.fit(img_b, target_size, method=Image.Resampling.LANCZOS)
-    final_image = Image.new('RGBA', (final_width, final_height))
+MASK_RIGHT = build_mask()
+
+def fit_box(width, height, size):
+    # ImageOps.fit(centering=(0.5, 0.5))과 같은 가운데 잘라내기 영역
+    target_ratio = size[0] / size[1]
+    if width / height > target_ratio:
+        crop_width = height * target_ratio
+        left = (width - crop_width) / 2
+        return (left, 0, left + crop_width, height)
+    crop_height = width / target_ratio
+    top = (height - crop_height) / 2
+    return (0, top, width, top + crop_height)
+
+def load_fitted(data, size=TARGET_SIZE):
+    """
+    이미지 바이트를 size에 맞게 잘라 줄인 RGBA 이미지를 반환합니다.
+    JPEG은 draft()로 디코딩 단계에서 필요한 크기까지만 줄여 읽고,
+    그 밖의 형식은 resize의 reducing_gap으로 정수배 축소를 먼저 한 뒤 LANCZOS로 맞춥니다.
+    """
+    img = Image.open(BytesIO(data))
+    width, height = img.size
+    scale = max(size[0] / width, size[1] / height)
+    if img.format == 'JPEG' and scale < 1:
+        img.draft('RGB', (int(width * scale) + 1, int(height * scale) + 1))
+    if img.mode not in ('RGB', 'RGBA'):
+        img = img.convert('RGBA')
+    # draft로 줄어든 크기에 맞춰 잘라낼 영역을 다시 계산합니다.
+    box = fit_box(img.size[0], img.size[1], size)
+    img = img.resize(size, Image.Resampling.LANCZOS, box=box, reducing_gap=3.0)
+    return img.convert('RGBA')
+
+def compose(img_a_fit, img_b_fit):
+    # 맞춰 둔 두 이미지를 겹쳐 1320x660 RGBA 이미지를 만듭니다.
+    final_image = Image.new('RGBA', FINAL_SIZE)
     final_image.paste(img_a_fit, (0, 0))
-    paste_x = 620
-    mask_array = np.ones((final_height, 700), dtype=np.uint8) * 255
-    gradient = np.linspace(0, 255, 80, dtype=np.uint8)
-    mask_array[:, :80] = np.tile(gradient, (final_height, 1))
-    mask_right = Image.fromarray(mask_array, mode='L')
-    final_image.paste(img_b_fit, (paste_x, 0), mask_right)
-    file_path = 'blended_image.png'
-    final_image.save(file_path)
-    return file_path
\ No newline at end of file
+    final_image.paste(img_b_fit, (PASTE_X, 0), MASK_RIGHT)
+    return final_image
+
+def blend_image(url_raw_a, url_raw_b, cache=None):
+    """두 그룹 사진을 합친 1320x660 RGBA 이미지를 반환합니다."""
+    cache = cache or get_image_cache()
+    # 두 원본 이미지를 동시에 받고(캐시에 있으면 바로 사용) 디코딩/축소도 각각 병렬로 처리합니다.
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        img_a_fit, img_b_fit = executor.map(lambda url: load_fitted(cache.get(url)), [url_raw_a, url_raw_b])
+    return compose(img_a_fit, img_b_fit)
+
+def make_image(url_raw_a, url_raw_b, cache=None, fmt='png', quality=None, target_bytes=None):
+    """
+    두 그룹 사진을 합친 이미지를 fmt 형식(png, webp, jpeg, avif)의 바이트로 반환합니다. (파일로 저장하지 않음)
+    quality/target_bytes는 image.encode.encode를 참고하세요.
+    """
+    return encode(blend_image(url_raw_a, url_raw_b, cache), fmt, quality, target_bytes)
+
+def make_image_variants(url_raw_a, url_raw_b, cache=None, fmt='png', widths=RESPONSIVE_WIDTHS, quality=None, target_bytes=None):
+    """
+    두 그룹 사진을 합친 이미지를 widths의 가로 크기별로 인코딩해 {가로: 바이트}로 반환합니다.
+    가장 큰 크기(1320)는 make_image와 같은 바이트이며, target_bytes는 image.encode.encode_variants를 참고하세요.
+    """
+    return encode_variants(blend_image(url_raw_a, url_raw_b, cache), fmt, widths, quality, target_bytes)
+
+def fit_source(data):
+    # 프로세스 풀에서 실행: 읽을 수 없는 이미지는 None
+    if data is None:
+        return None
+    try:
+        return load_fitted(data)
+    except OSError:
+        return None
+
+def render_pairs(task):
+    # 프로세스 풀에서 실행: ({URL: 맞춘 이미지}, [(A URL, B URL)], fmt, quality, target_bytes) → 인코딩된 바이트 목록
+    fitted, pairs, fmt, quality, target_bytes = task
+    images = []
+    for url_a, url_b in pairs:
+        img_a_fit, img_b_fit = fitted[url_a], fitted[url_b]
+        if img_a_fit is None or img_b_fit is None:
+            images.append(None)
+        else:
+            images.append(encode(compose(img_a_fit, img_b_fit), fmt, quality, target_bytes))
+    return images
+
+def make_images(pairs, cache=None, fmt='png', quality=None, target_bytes=None, workers=None):
+    """
+    여러 (A 이미지 URL, B 이미지 URL) 쌍의 합성 이미지를 한 번에 만들어 pairs 순서대로 바이트 목록으로 반환합니다.
+    - 여러 쌍에 나오는 같은 사진은 한 번만 받고 한 번만 잘라 줄입니다.
+    - 잘라 줄이기와 합성/인코딩은 workers개 프로세스(기본: CPU 수)에 나눠 처리합니다.
+    - 합성은 쌍을 workers개 묶음으로 나눠 맡기고, 묶음마다 필요한 사진만 URL로 찾을 수 있게 한 번씩 보냅니다.
+      (쌍마다 맞춘 이미지 두 장을 보내지 않으므로 같은 사진이 한 프로세스에 여러 번 가지 않음)
+    받거나 읽지 못한 사진이 들어간 쌍은 None입니다.
+    """
+    pairs = [(normalize_image_url(a), normalize_image_url(b)) for a, b in pairs]
+    cache = cache or get_image_cache()
+    workers = workers or os.cpu_count() or 1
+    urls = list(dict.fromkeys(url for pair in pairs for url in pair))
+
+    def download(url):
+        try:
+            return cache.get(url)
+        except requests.RequestException as e:
+            print(f"이미지를 받지 못했습니다: {url} ({e})")
+            return None
+
+    with ThreadPoolExecutor(max_workers=min(8, max(1, len(urls)))) as executor:
+        sources = list(executor.map(download, urls))
+
+    # 쌍이 하나뿐이거나 workers=1이면 프로세스를 띄우지 않고 바로 처리합니다.
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 and len(pairs) > 1 else None
+    run = executor.map if executor else map
+    try:
+        fitted = dict(zip(urls, run(fit_source, sources)))
+        for url, data in zip(urls, sources):
+            if data is not None and fitted[url] is None:
+                print(f"이미지를 읽지 못했습니다: {url}")
+        chunk_size = max(1, -(-len(pairs) // workers)) if executor else max(1, len(pairs))
+        tasks = []
+        for start in range(0, len(pairs), chunk_size):
+            chunk = pairs[start:start + chunk_size]
+            tasks.append(({url: fitted[url] for pair in chunk for url in pair}, chunk, fmt, quality, target_bytes))
+        return [image for images in run(render_pairs, tasks) for image in images]
+    finally:
+        if executor:
+            executor.shutdown()
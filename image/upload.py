@@ -1,22 +1,132 @@
-
 from google.cloud import storage
 import os
 import json
-import datetime
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from google.api_core.exceptions import PreconditionFailed
+from google.auth.transport.requests import AuthorizedSession
 from google.oauth2 import service_account
+from requests.adapters import HTTPAdapter
+
+BUCKET_NAME = 'starglow-voting.firebasestorage.app'
+# 동시에 여러 세션이 업로드해도 연결을 새로 맺지 않도록 유지할 연결 수
+UPLOAD_POOL_SIZE = 8
+# 이미 올린 이미지(blob 이름 → URL) 기록. 같은 이미지를 다시 올리지 않기 위해 사용합니다.
+DEFAULT_UPLOAD_MANIFEST = ".upload_manifest.json"
 
-def upload_image(image_path, destination_blob_name):
+_bucket = None
+_bucket_lock = threading.Lock()
+_manifests = {}
+_manifest_lock = threading.Lock()
+
+def build_bucket(pool_size=UPLOAD_POOL_SIZE):
     google_service_account_str = os.environ.get('GOOGLE_SERVICE_ACCOUNT')
     if not google_service_account_str:
         raise ValueError('GOOGLE_SERVICE_ACCOUNT 환경 변수가 설정되어 있지 않습니다.')
     google_service_account_info = json.loads(google_service_account_str)
-    credentials = service_account.Credentials.from_service_account_info(google_service_account_info)
-    client = storage.Client(credentials=credentials, project=credentials.project_id)
-    bucket = client.bucket('starglow-voting.firebasestorage.app')
-    timestamp = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
+    credentials = service_account.Credentials.from_service_account_info(
+        google_service_account_info, scopes=storage.Client.SCOPE)
+    # 토큰은 credentials에 보관되어 만료 전까지 재사용되고, 연결은 세션의 풀에서 재사용됩니다.
+    session = AuthorizedSession(credentials)
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    client = storage.Client(credentials=credentials, project=credentials.project_id, _http=session)
+    return client.bucket(BUCKET_NAME)
+
+def get_bucket():
+    # 스토리지 클라이언트와 버킷은 프로세스에서 처음 쓸 때 한 번만 만들어 재사용합니다.
+    global _bucket
+    with _bucket_lock:
+        if _bucket is None:
+            _bucket = build_bucket()
+        return _bucket
+
+def reset_bucket():
+    # 서비스 계정이 바뀐 경우 등 다음 업로드에서 클라이언트를 새로 만들도록 합니다.
+    global _bucket
+    with _bucket_lock:
+        _bucket = None
+
+def load_manifest(path=DEFAULT_UPLOAD_MANIFEST):
+    # 경로별로 한 번만 읽어 프로세스에서 공유합니다. (_manifest_lock을 잡은 상태에서 호출)
+    if path not in _manifests:
+        try:
+            with open(path, encoding="utf-8") as f:
+                _manifests[path] = json.load(f)
+        except (OSError, ValueError):
+            _manifests[path] = {}
+    return _manifests[path]
+
+def record_upload(blob_name, url, path=DEFAULT_UPLOAD_MANIFEST):
+    with _manifest_lock:
+        manifest = load_manifest(path)
+        manifest[blob_name] = url
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+def public_url(bucket_name, blob_name):
+    return f'https://firebasestorage.googleapis.com/v0/b/{bucket_name}/o/{blob_name}?alt=media'
+
+def content_blob_name(image_data, destination_blob_name):
+    # 이름 뒤에 내용 해시를 붙여 같은 이미지는 항상 같은 blob 이름이 되도록 합니다.
+    base, ext = os.path.splitext(destination_blob_name)
+    digest = hashlib.sha256(image_data).hexdigest()[:16]
+    return f'{base}_{digest}{ext}'
+
+def upload_image(image_data, destination_blob_name, content_type='image/png', manifest_path=DEFAULT_UPLOAD_MANIFEST):
+    """
+    image_data(make_image가 반환한 이미지 바이트)를 임시 파일 없이 올리고 공개 URL을 반환합니다.
+    blob 이름은 destination_blob_name에 내용 해시를 붙여 만들며, 같은 이미지를 다시 올리면
+    로컬 기록(manifest)에서 찾아 업로드 없이 기존 URL을 반환합니다. 기록에 없어도 버킷에
+    이미 있는 객체는 조건부 업로드(if_generation_match=0)로 덮어쓰지 않습니다.
+    """
+    blob_name = content_blob_name(image_data, destination_blob_name)
+    with _manifest_lock:
+        url = load_manifest(manifest_path).get(blob_name)
+    if url:
+        print(f'Image {blob_name} already uploaded, reusing it.')
+        return url
+    bucket = get_bucket()
+    url = public_url(bucket.name, blob_name)
+    try:
+        # 같은 이름의 객체가 이미 있으면 덮어쓰지 않고 412로 거절됩니다. (존재 확인 요청을 따로 보내지 않음)
+        bucket.blob(blob_name).upload_from_string(image_data, content_type=content_type, if_generation_match=0)
+        print(f'Image ({len(image_data)} bytes) uploaded to {blob_name} in Firebase Storage.')
+    except PreconditionFailed:
+        print(f'Image {blob_name} already exists in Firebase Storage.')
+    record_upload(blob_name, url, manifest_path)
+    return url
+
+def variant_blob_name(destination_blob_name, width):
+    # 반응형 크기별 이름: blended_image.webp → blended_image_660w.webp (내용 해시는 upload_image에서 붙임)
     base, ext = os.path.splitext(destination_blob_name)
-    destination_blob_name = f'{base}_{timestamp}{ext}'
-    blob = bucket.blob(destination_blob_name)
-    blob.upload_from_filename(image_path)
-    print(f'Image {image_path} uploaded to {destination_blob_name} in Firebase Storage.')
-    return f'https://firebasestorage.googleapis.com/v0/b/{bucket.name}/o/{destination_blob_name}?alt=media'
\ No newline at end of file
+    return f'{base}_{width}w{ext}'
+
+def upload_images(images, destination_blob_name, content_type='image/png', manifest_path=DEFAULT_UPLOAD_MANIFEST):
+    """
+    여러 이미지 바이트를 UPLOAD_POOL_SIZE개 스레드로 동시에 올리고 images 순서대로 URL 목록을 반환합니다.
+    blob 이름은 upload_image와 같이 내용 해시로 정하며, None인 이미지는 올리지 않고 None을 돌려줍니다.
+    images의 각 항목은 바이트 또는 (바이트, blob 이름)입니다.
+    """
+    def upload(item):
+        if item is None:
+            return None
+        image_data, blob_name = item if isinstance(item, tuple) else (item, destination_blob_name)
+        return upload_image(image_data, blob_name, content_type, manifest_path)
+
+    images = list(images)
+    with ThreadPoolExecutor(max_workers=min(UPLOAD_POOL_SIZE, max(1, len(images)))) as executor:
+        return list(executor.map(upload, images))
+
+def upload_variants(variants, destination_blob_name, content_type='image/png', manifest_path=DEFAULT_UPLOAD_MANIFEST):
+    """
+    encode_variants가 만든 {가로: 바이트}를 크기별 이름으로 동시에 올리고 {가로: URL}을 반환합니다.
+    가장 큰 크기가 기본 이미지이며 그 URL은 urls[max(urls)]입니다.
+    """
+    widths = sorted(variants, reverse=True)
+    items = [(variants[width], variant_blob_name(destination_blob_name, width)) for width in widths]
+    return dict(zip(widths, upload_images(items, destination_blob_name, content_type, manifest_path)))
@@ -0,0 +1,100 @@
+import numpy as np
+
+class GroupIndex:
+    """
+    그룹 DataFrame을 구독자 수로 정렬한 배열을 만들어 두고,
+    구독자 범위 검색과 가까운 그룹 검색을 searchsorted(O(log n))로 처리합니다.
+    - 제외할 그룹은 group_name으로 지정합니다.
+    - 반환하는 행은 df.iloc[...]로 꺼낸 Series입니다.
+    """
+    def __init__(self, df, seed=None):
+        self.df = df
+        subscribers = df['youtube_subscribers'].to_numpy(dtype=np.float64)
+        order = np.argsort(subscribers, kind='stable')
+        self.positions = order
+        self.subscribers = subscribers[order]
+        self.names = df['group_name'].to_numpy(dtype=object)[order]
+        # 이름이 같은 행이 여럿이면 기존 검색(iloc[0])처럼 DataFrame에서 앞에 있는 행을 찾습니다.
+        ranks = np.empty(len(order), dtype=np.int64)
+        ranks[order] = np.arange(len(order))
+        self.name_to_rank = {}
+        for position, name in enumerate(df['group_name']):
+            self.name_to_rank.setdefault(name, int(ranks[position]))
+        self.rng = np.random.default_rng(seed)
+
+    def __len__(self):
+        return len(self.positions)
+
+    def row(self, rank):
+        return self.df.iloc[self.positions[rank]]
+
+    def find(self, group_name):
+        """이름이 같은 행을 반환합니다. 없으면 None."""
+        rank = self.name_to_rank.get(group_name)
+        return None if rank is None else self.row(rank)
+
+    def window(self, low=None, high=None):
+        """구독자 수가 [low, high]인 구간의 (시작, 끝) 순위를 반환합니다."""
+        start = 0 if low is None else int(np.searchsorted(self.subscribers, low, side='left'))
+        end = len(self) if high is None else int(np.searchsorted(self.subscribers, high, side='right'))
+        return start, max(start, end)
+
+    def count_between(self, low=None, high=None):
+        start, end = self.window(low, high)
+        return end - start
+
+    def _pick(self, start, end, exclude, rng):
+        if end <= start:
+            return None
+        # 제외 대상은 보통 1~2개라 몇 번 다시 뽑으면 충분합니다.
+        for _ in range(8):
+            rank = int(rng.integers(start, end))
+            if self.names[rank] not in exclude:
+                return rank
+        ranks = [rank for rank in range(start, end) if self.names[rank] not in exclude]
+        return int(rng.choice(ranks)) if ranks else None
+
+    def sample(self, low=None, high=None, exclude=(), rng=None):
+        """구독자 수가 [low, high]인 그룹 중 하나를 무작위로 반환합니다. 없으면 None."""
+        rng = rng or self.rng
+        start, end = self.window(low, high)
+        rank = self._pick(start, end, set(exclude), rng)
+        return None if rank is None else self.row(rank)
+
+    def nearest(self, subscribers, k=5, exclude=(), low=None):
+        """구독자 수가 가장 가까운 그룹 k개의 순위를 반환합니다. (low 미만은 제외)"""
+        exclude = set(exclude)
+        floor = self.window(low)[0]
+        right = int(np.searchsorted(self.subscribers, subscribers, side='left'))
+        left = right - 1
+        ranks = []
+        while len(ranks) < k and (left >= floor or right < len(self)):
+            take_left = right >= len(self) or (
+                left >= floor and subscribers - self.subscribers[left] <= self.subscribers[right] - subscribers
+            )
+            if take_left:
+                rank, left = left, left - 1
+            else:
+                rank, right = right, right + 1
+            if self.names[rank] not in exclude:
+                ranks.append(rank)
+        return ranks
+
+    def sample_similar(self, subscribers, threshold=0.1, exclude=(), k=5, low=None, rng=None):
+        """
+        구독자 수가 ±threshold 범위 안인 그룹 중 하나를 무작위로 고릅니다.
+        범위 안에 후보가 없으면 가장 가까운 k개 중에서 고르고, 그래도 없으면 None.
+        """
+        rng = rng or self.rng
+        exclude = set(exclude)
+        range_min = subscribers * (1 - threshold)
+        if low is not None:
+            range_min = max(range_min, low)
+        start, end = self.window(range_min, subscribers * (1 + threshold))
+        rank = self._pick(start, end, exclude, rng)
+        if rank is None:
+            ranks = self.nearest(subscribers, k=k, exclude=exclude, low=low)
+            if not ranks:
+                return None
+            rank = ranks[int(rng.integers(len(ranks)))]
+        return self.row(rank)
@@ -1,28 +1,24 @@
 
 import os
 from openai import OpenAI
+import numpy as np
 import pandas as pd
+from store.serialize import read_csv
+from quest.group_index import GroupIndex
 from dotenv import load_dotenv
 load_dotenv()
 client = OpenAI(api_key=os.environ['OPENAI'])
 
-def select_similar_group(df, group, threshold=0.1):
-    subscribers = group['youtube_subscribers']
-    range_min = subscribers * (1 - threshold)
-    range_max = subscribers * (1 + threshold)
-    similar_df = df[
-        (df['youtube_subscribers'] >= range_min) &
-        (df['youtube_subscribers'] <= range_max) &
-        (df['group_name'] != group['group_name'])
-    ]
-    if similar_df.empty:
-        df_no_group = df[df['group_name'] != group['group_name']].copy()
-        df_no_group['diff'] = (df_no_group['youtube_subscribers'] - subscribers).abs()
-        similar_df = df_no_group.sort_values(by='diff').head(5)
-    return similar_df.sample(n=1).iloc[0]
-
-def load_data(csv_path='groups_data_updated.csv'):
-    df = pd.read_csv(csv_path)
+def select_similar_group(df, group, threshold=0.1, index=None):
+    index = GroupIndex(df) if index is None else index
+    return index.sample_similar(group['youtube_subscribers'], threshold, exclude=[group['group_name']])
+
+def load_data(csv_path='groups_data_updated.csv', store=None):
+    """
+    그룹 데이터를 읽어 투표에 쓸 수 있는 행만 남깁니다.
+    store(GroupStore)가 주어지면 CSV를 파싱하지 않고 csv_path 이름의 스냅샷을 읽습니다.
+    """
+    df = store.load(csv_path) if store is not None else read_csv(csv_path)
     df = df.dropna(subset=['youtube_subscribers'])
     df['youtube_subscribers'] = df['youtube_subscribers'].astype(int)
     df = df[df['youtube_subscribers'] > 0]
@@ -32,58 +28,96 @@ def load_data(csv_path='groups_data_updated.csv'):
         df[col] = df[col].fillna('Not available')
     return df
 
-def select_two_groups_random(df):
-    group_A = df.sample(n=1).iloc[0]
-    group_B = select_similar_group(df, group_A)
+def select_two_groups_random(df, index=None):
+    index = GroupIndex(df) if index is None else index
+    group_A = index.sample()
+    group_B = select_similar_group(df, group_A, index=index)
     return group_A, group_B
 
-def select_groups_with_min_subscribers(df, min_subscribers, threshold=0.1):
-    df_filtered = df[df['youtube_subscribers'] >= min_subscribers]
-    if df_filtered.empty:
+def select_groups_with_min_subscribers(df, min_subscribers, threshold=0.1, index=None):
+    index = GroupIndex(df) if index is None else index
+    group_A = index.sample(low=min_subscribers)
+    if group_A is None:
         raise ValueError("No groups meet the minimum subscriber requirement.")
-
-    group_A = df_filtered.sample(n=1).iloc[0]
-    group_B = select_similar_group(df_filtered, group_A, threshold)
+    group_B = index.sample_similar(
+        group_A['youtube_subscribers'], threshold, exclude=[group_A['group_name']], low=min_subscribers
+    )
     return group_A, group_B
 
-def count_groups_with_min_subscribers(df, min_subscribers):
-    return len(df[df['youtube_subscribers'] >= min_subscribers])
+def count_groups_with_min_subscribers(df, min_subscribers, index=None):
+    index = GroupIndex(df) if index is None else index
+    return index.count_between(low=min_subscribers)
 
 def search_groups(df, keyword):
     return df[df['group_name'].str.contains(keyword, case=False, na=False)]
 
-def select_groups_by_search(df, selected_group_name, threshold=0.1):
-    matched_groups = df[df['group_name'] == selected_group_name]
-    if matched_groups.empty:
+def select_groups_by_search(df, selected_group_name, threshold=0.1, index=None):
+    index = GroupIndex(df) if index is None else index
+    group_A = index.find(selected_group_name)
+    if group_A is None:
         raise ValueError("Selected group not found.")
     
-    group_A = matched_groups.iloc[0]
-    group_B = select_similar_group(df, group_A, threshold)
+    group_B = select_similar_group(df, group_A, threshold, index=index)
     return group_A, group_B
 
-def reselect_group(df, fixed_group):
+def reselect_group(df, fixed_group, index=None):
     """
     fixed_group의 youtube_subscribers를 기준으로 ±10% 범위 내에서
     새로운 그룹을 선택합니다.
     만약 해당 범위 내 후보가 없다면, 구독자 차이가 가장 적은 상위 5개 후보 중 랜덤 선택합니다.
     """
-    target_subscribers = fixed_group['youtube_subscribers']
-    threshold = 0.1 * target_subscribers
-    # 고정 그룹과 다른 그룹들만 후보로 선정
-    candidates = df[df['group_name'] != fixed_group['group_name']]
-    similar_candidates = candidates[
-        (candidates['youtube_subscribers'] >= target_subscribers - threshold) &
-        (candidates['youtube_subscribers'] <= target_subscribers + threshold)
-    ]
-    if similar_candidates.empty:
-        candidates = candidates.copy()
-        candidates['diff'] = (candidates['youtube_subscribers'] - target_subscribers).abs()
-        similar_candidates = candidates.sort_values('diff').head(5)
-    return similar_candidates.sample(n=1).iloc[0]
+    return select_similar_group(df, fixed_group, 0.1, index=index)
+
+def generate_matchups(df, n, threshold=0.1, min_subscribers=0, seed=None, max_rounds=8):
+    """
+    구독자 수가 비슷한(±threshold) 그룹 쌍 n개를 한 번에 만듭니다. 한 그룹은 한 쌍에만 들어갑니다.
+    로그 구독자 수에 threshold 폭의 난수를 더해 정렬한 뒤 이웃한 두 그룹을 묶고,
+    범위를 벗어난 쌍은 버린 뒤 남은 그룹으로 다시 시도합니다. 같은 seed면 같은 결과가 나옵니다.
+    만들 수 있는 쌍이 n보다 적으면 가능한 만큼만 반환합니다.
+    """
+    rng = np.random.default_rng(seed)
+    subscribers = df['youtube_subscribers'].to_numpy(dtype=np.float64)
+    names = df['group_name'].to_numpy(dtype=object)
+    remaining = np.flatnonzero(subscribers >= max(min_subscribers, 1))
+    if len(remaining) < 2:
+        raise ValueError("No groups meet the minimum subscriber requirement.")
+
+    jitter = np.log1p(threshold) / 2
+    pairs_a = []
+    pairs_b = []
+    found = 0
+    for _ in range(max_rounds):
+        if found >= n or len(remaining) < 2:
+            break
+        keys = np.log(subscribers[remaining]) + rng.uniform(-jitter, jitter, len(remaining))
+        ordered = remaining[np.argsort(keys, kind='stable')]
+        offset = int(rng.integers(2)) if len(ordered) > 2 else 0
+        usable = (len(ordered) - offset) // 2 * 2
+        a = ordered[offset:offset + usable:2]
+        b = ordered[offset + 1:offset + usable:2]
+        low = np.minimum(subscribers[a], subscribers[b])
+        high = np.maximum(subscribers[a], subscribers[b])
+        valid = (high <= low * (1 + threshold)) & (names[a] != names[b])
+        chosen = rng.permutation(np.flatnonzero(valid))[:n - found]
+        if len(chosen) == 0:
+            continue
+        # 쌍 안에서 A/B 순서도 무작위로 섞습니다.
+        swap = rng.random(len(chosen)) < 0.5
+        pairs_a.append(np.where(swap, b[chosen], a[chosen]))
+        pairs_b.append(np.where(swap, a[chosen], b[chosen]))
+        found += len(chosen)
+        used = np.concatenate([a[chosen], b[chosen]])
+        remaining = remaining[~np.isin(remaining, used)]
+
+    if not pairs_a:
+        return []
+    first = np.concatenate(pairs_a)
+    second = np.concatenate(pairs_b)
+    return [(df.iloc[i], df.iloc[j]) for i, j in zip(first, second)]
 
 def row_to_dict(row):
     dict_full = row.to_dict()
-    return {k: v for k, v in dict_full.items() if pd.notnull(v) and v != ''}
+    return {k: v for k, v in dict_full.items() if isinstance(v, (list, dict)) or (pd.notnull(v) and v != '')}
 
 def build_prompt(group_A, group_B):
     """
@@ -0,0 +1,127 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from quest.group_index import GroupIndex
+
+# Poll List 시트의 start/end 날짜 형식
+DATE_FORMAT = "%Y-%m-%d %H:%M"
+
+def option_name(group_name):
+    # generate_poll_options와 같은 규칙으로 괄호 앞부분만 사용합니다.
+    return str(group_name).split(' (')[0]
+
+def parse_date(value):
+    try:
+        return datetime.strptime(value, DATE_FORMAT)
+    except (TypeError, ValueError):
+        return None
+
+def next_poll_id(poll_id, step=1):
+    if poll_id and poll_id.startswith("p"):
+        try:
+            return "p" + str(int(poll_id[1:]) + step)
+        except ValueError:
+            pass
+    return "p" + str(step)
+
+def plan_season(df, history=(), days=90, start=None, duration=timedelta(days=1), cooldown_days=14,
+                threshold=0.1, min_subscribers=0, seed=None):
+    """
+    앞으로 days일 동안 하루 한 개씩 투표할 그룹 쌍을 정합니다.
+    - 한 그룹은 마지막 투표(기존 이력 포함) 후 cooldown_days일이 지나야 다시 나옵니다.
+    - 이미 투표한 적 있는 쌍(순서 무관)은 다시 만들지 않습니다.
+    - 두 그룹은 성별(gender)이 같고 구독자 수가 ±threshold 안이어야 하며,
+      날짜마다 지금까지 가장 적게 배정된 성별을 먼저 시도해 성별 비율을 맞춥니다.
+    history는 sheets.finder.get_poll_history()의 결과입니다. start가 없으면 마지막 투표의
+    start 다음 날부터 시작하며, poll_id도 이어서 붙입니다.
+    반환: [{"poll_id", "start", "end", "group_A", "group_B"}] (쌍을 만들지 못한 날은 빠짐)
+    """
+    rng = np.random.default_rng(seed)
+    df = df[df['youtube_subscribers'] >= max(min_subscribers, 1)]
+    genders = df['gender'].fillna('')
+    # 성별마다 구독자 정렬 인덱스를 따로 만들어 같은 성별 안에서만 짝을 찾습니다.
+    indexes = {gender: GroupIndex(df[genders == gender]) for gender in sorted(set(genders)) if gender}
+    # option_name(괄호 앞 이름) → 같은 이름을 가진 group_name들 (GroupIndex의 제외는 group_name 기준)
+    group_names = {}
+    for group_name in df['group_name']:
+        group_names.setdefault(option_name(group_name), set()).add(group_name)
+
+    # 기존 이력에서 그룹별 마지막 투표일과 이미 만난 상대를 모읍니다.
+    last_poll_id = None
+    last_start = None
+    partners = {}
+    history_dates = []
+    for poll in history:
+        options = [option_name(option) for option in poll.get("options", []) if option]
+        poll_start = parse_date(poll.get("start"))
+        if len(options) >= 2:
+            add_partners(partners, options[0], options[1])
+        if poll_start is not None:
+            history_dates.append((poll_start, options))
+            if last_start is None or poll_start >= last_start:
+                last_start = poll_start
+        if poll.get("poll_id"):
+            last_poll_id = poll["poll_id"]
+
+    if start is None:
+        start = (last_start + timedelta(days=1)) if last_start else datetime.now().replace(second=0, microsecond=0)
+    last_used = {}
+    for poll_start, options in history_dates:
+        day = (poll_start - start).days
+        for option in options:
+            last_used[option] = max(last_used.get(option, day), day)
+
+    gender_counts = {gender: 0 for gender in indexes}
+    schedule = []
+    for day in range(days):
+        # 쿨다운 중인 그룹 (group_name 기준)
+        cooling = set()
+        for option, used_day in last_used.items():
+            if used_day > day - cooldown_days:
+                cooling |= group_names.get(option, set())
+        pair = None
+        for gender in sorted(gender_counts, key=lambda g: (gender_counts[g], rng.random())):
+            pair = pick_pair(indexes[gender], cooling, partners, group_names, threshold, rng)
+            if pair is not None:
+                gender_counts[gender] += 1
+                break
+        if pair is None:
+            print(f"{day + 1}일차: 조건을 만족하는 쌍이 없어 건너뜁니다.")
+            continue
+        group_a, group_b = pair
+        name_a, name_b = option_name(group_a['group_name']), option_name(group_b['group_name'])
+        last_used[name_a] = last_used[name_b] = day
+        add_partners(partners, name_a, name_b)
+        poll_start = start + timedelta(days=day)
+        schedule.append({
+            "poll_id": next_poll_id(last_poll_id, len(schedule) + 1),
+            "start": poll_start.strftime(DATE_FORMAT),
+            "end": (poll_start + duration).strftime(DATE_FORMAT),
+            "group_A": group_a,
+            "group_B": group_b,
+        })
+    return schedule
+
+def add_partners(partners, name_a, name_b):
+    partners.setdefault(name_a, set()).add(name_b)
+    partners.setdefault(name_b, set()).add(name_a)
+
+def pick_pair(index, cooling, partners, group_names, threshold, rng, attempts=32):
+    """
+    index(GroupIndex)에서 쿨다운 중이 아닌 그룹 A를 무작위로 고르고, 구독자 수가 A의 ±threshold 안이면서
+    A와 만난 적 없는 그룹 B를 GroupIndex.sample로 찾습니다. 찾으면 (A 행, B 행), 없으면 None.
+    """
+    for _ in range(attempts):
+        group_a = index.sample(exclude=cooling, rng=rng)
+        if group_a is None:
+            return None
+        name_a = option_name(group_a['group_name'])
+        exclude = set(cooling) | group_names.get(name_a, set())
+        for partner in partners.get(name_a, ()):
+            exclude |= group_names.get(partner, set())
+        subscribers = group_a['youtube_subscribers']
+        group_b = index.sample(low=subscribers * (1 - threshold), high=subscribers * (1 + threshold), exclude=exclude, rng=rng)
+        if group_b is not None:
+            return group_a, group_b
+    return None
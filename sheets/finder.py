@@ -4,7 +4,7 @@ import gspread
 from oauth2client.service_account import ServiceAccountCredentials
 from datetime import datetime, timedelta
 
-def find_latest_poll_id():
+def open_poll_sheet():
     # 환경 변수에서 서비스 계정 정보를 JSON 문자열로 가져와 딕셔너리로 변환
     google_service_account_str = os.environ.get("GOOGLE_SERVICE_ACCOUNT")
     if not google_service_account_str:
@@ -16,7 +16,10 @@ def find_latest_poll_id():
     gc = gspread.authorize(creds)
 
     # 지정된 구글 스프레드시트와 워크시트 열기
-    sheet = gc.open_by_url("https://docs.google.com/spreadsheets/d/1ZRL_ifqMs35BHOgYMxY59xUTb-l5r2HdCnI1GTneni4").worksheet("Poll List")
+    return gc.open_by_url("https://docs.google.com/spreadsheets/d/1ZRL_ifqMs35BHOgYMxY59xUTb-l5r2HdCnI1GTneni4").worksheet("Poll List")
+
+def find_latest_poll_id():
+    sheet = open_poll_sheet()
     
     # 헤더 읽기 및 각 열의 인덱스(1-indexed) 매핑 생성
     header = sheet.row_values(1)
@@ -83,4 +86,29 @@ def find_latest_poll_id():
         row_obj["start"] = new_start
         row_obj["end"] = new_end
 
-        return row_obj
\ No newline at end of file
+        return row_obj
+
+def get_poll_history():
+    """
+    Poll List 시트의 기존 투표를 모두 읽어 반환합니다. (시즌 계획용)
+    반환: [{"poll_id", "options": [그룹 이름, ...], "start", "end"}] (title이 있는 행만)
+    """
+    sheet = open_poll_sheet()
+
+    # 한 번의 요청으로 시트 전체를 읽습니다.
+    rows = sheet.get_all_values()
+    if not rows:
+        return []
+    header = rows[0]
+    history = []
+    for values in rows[1:]:
+        row_obj = {header[i]: values[i] if i < len(values) else "" for i in range(len(header))}
+        if not row_obj.get("title"):
+            continue
+        history.append({
+            "poll_id": row_obj.get("poll_id", ""),
+            "options": [option.strip() for option in row_obj.get("options", "").split(";") if option.strip()],
+            "start": row_obj.get("start", ""),
+            "end": row_obj.get("end", ""),
+        })
+    return history
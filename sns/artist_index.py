@@ -0,0 +1,71 @@
+import unicodedata
+
+# 트라이 노드마다 기억해 둘 행 위치 수 (제외할 그룹이 있어도 다음 후보를 바로 찾기 위함)
+MAX_POSITIONS_PER_NODE = 4
+
+def normalize_name(name):
+    """대소문자, 전각/반각 차이를 없앤 비교용 이름을 만듭니다."""
+    return unicodedata.normalize("NFKC", str(name)).casefold().strip()
+
+class ArtistIndex:
+    """
+    group_name을 정규화해 한 번만 색인해 두고 아티스트 이름으로 그룹을 찾습니다.
+    - 이름 전체가 같은 그룹을 먼저 찾고(dict),
+    - 없으면 아티스트 이름을 포함하는 그룹을 모든 접미사로 만든 트라이로 찾습니다.
+    여러 그룹이 맞으면 DataFrame에서 앞에 있는 행을 고릅니다. (기존 str.contains + iloc[0]과 같음)
+    정규식을 쓰지 않으므로 이름에 특수문자가 있어도 안전합니다.
+    """
+    def __init__(self, df):
+        self.df = df
+        self.names = [normalize_name(name) for name in df['group_name']]
+        self.exact = {}
+        self.trie = {}
+        for position, name in enumerate(self.names):
+            self.exact.setdefault(name, []).append(position)
+            for start in range(len(name)):
+                node = self.trie
+                for char in name[start:]:
+                    node = node.setdefault(char, {})
+                    positions = node.setdefault("", [])
+                    if len(positions) < MAX_POSITIONS_PER_NODE and (not positions or positions[-1] != position):
+                        positions.append(position)
+
+    def _first(self, positions, exclude):
+        for position in positions:
+            if self.names[position] not in exclude:
+                return position
+        return None
+
+    def match_position(self, artist, exclude=()):
+        """아티스트 이름에 맞는 행 위치를 반환합니다. 없으면 None. exclude는 제외할 group_name들."""
+        if not artist:
+            return None
+        key = normalize_name(artist)
+        if not key:
+            return None
+        exclude = {normalize_name(name) for name in exclude}
+        position = self._first(self.exact.get(key, []), exclude)
+        if position is not None:
+            return position
+        node = self.trie
+        for char in key:
+            node = node.get(char)
+            if node is None:
+                return None
+        return self._first(node[""], exclude)
+
+    def match(self, artist, exclude=()):
+        position = self.match_position(artist, exclude)
+        return None if position is None else self.df.iloc[position]
+
+    def match_tracks(self, tracks, exclude=()):
+        """플레이리스트 트랙마다 첫 번째 아티스트로 그룹을 찾아 [(트랙, 행 위치)]를 반환합니다."""
+        matched = []
+        for track in tracks:
+            artists = track.get('artists') or []
+            if not artists:
+                continue
+            position = self.match_position(artists[0].get('name'), exclude)
+            if position is not None:
+                matched.append((track, position))
+        return matched
@@ -1,11 +1,9 @@
 
-import ast
-
 def link_picker(group):
-    sns_str = group.get('sns_parsed', [])
-    if not sns_str:
+    # sns_parsed는 store.serialize로 읽을 때 이미 리스트입니다.
+    urls = group.get('sns_parsed', [])
+    if not isinstance(urls, list) or not urls:
         return
-    urls = ast.literal_eval(sns_str)
     url = ''
     for domain in ['x.com', 'twitter.com', 'instagram.com', 'youtube.com']:
         for u in urls:
@@ -0,0 +1,108 @@
+import math
+import time
+
+import pandas as pd
+
+# 행별 갱신 상태를 담는 컬럼 (마지막 조회 시각, 하루당 구독자 변동률, 다음 갱신 시각)
+CHECKED_AT_COLUMN = "youtube_checked_at"
+VOLATILITY_COLUMN = "youtube_volatility"
+NEXT_REFRESH_COLUMN = "youtube_next_refresh"
+REFRESH_COLUMNS = [CHECKED_AT_COLUMN, VOLATILITY_COLUMN, NEXT_REFRESH_COLUMN]
+
+DAY = 24 * 3600
+# 변동률을 모르는 채널은 하루 0.2% 변한다고 가정합니다.
+DEFAULT_VOLATILITY = 0.002
+# 구독자 수가 이 비율만큼 바뀌었을 것으로 예상될 때 다시 조회합니다.
+TARGET_DRIFT = 0.02
+MIN_INTERVAL_DAYS = 1
+MAX_INTERVAL_DAYS = 60
+# YouTube Data API 기본 일일 할당량(unit)
+DEFAULT_DAILY_BUDGET = 10000
+STATS_BATCH_SIZE = 50
+
+def size_score(subscribers):
+    """구독자 수를 0~1 점수로 바꿉니다. (1천만 명 이상이면 1)"""
+    if not subscribers or subscribers <= 1:
+        return 0.0
+    return min(1.0, math.log10(subscribers) / 7)
+
+def refresh_interval(subscribers, volatility=None):
+    """
+    다음 조회까지의 간격(초)을 구합니다.
+    변동이 큰 채널일수록, 구독자가 많아 투표에 자주 뽑히는 채널일수록 간격이 짧아집니다.
+    """
+    if volatility is None or pd.isna(volatility) or volatility <= 0:
+        volatility = DEFAULT_VOLATILITY
+    days = TARGET_DRIFT / volatility
+    days *= 1.5 - 0.5 * size_score(subscribers)
+    days = min(MAX_INTERVAL_DAYS, max(MIN_INTERVAL_DAYS, days))
+    return days * DAY
+
+def update_refresh_state(prev_subscribers, prev_checked_at, prev_volatility, subscribers, now=None):
+    """
+    새로 조회한 구독자 수로 변동률을 갱신하고 (변동률, 다음 갱신 시각)을 반환합니다.
+    변동률은 이전 값과 이번 관측값의 평균(지수 이동 평균)으로 둡니다.
+    """
+    now = time.time() if now is None else now
+    volatility = prev_volatility if prev_volatility is not None and not pd.isna(prev_volatility) else None
+    if (prev_subscribers and not pd.isna(prev_subscribers) and prev_subscribers > 0
+            and prev_checked_at and not pd.isna(prev_checked_at)):
+        elapsed_days = (now - prev_checked_at) / DAY
+        if elapsed_days >= 0.5:
+            observed = abs(subscribers - prev_subscribers) / prev_subscribers / elapsed_days
+            volatility = observed if volatility is None else 0.5 * volatility + 0.5 * observed
+    return volatility, now + refresh_interval(subscribers, volatility)
+
+def poll_weight(row):
+    """투표에 뽑힐 가능성. load_data에서 제외되는 행(이미지 없음, 해체)은 거의 0입니다."""
+    image = row.get("image")
+    if pd.isna(image) or image == "" or not pd.isna(row.get("disbanded")):
+        return 0.1
+    return 0.5 + size_score(row.get("youtube_subscribers"))
+
+def plan_refresh(df, budget=DEFAULT_DAILY_BUDGET, now=None, needs_lookup=None):
+    """
+    갱신할 행의 인덱스 목록을 우선순위 순으로 반환합니다.
+    - 구독자 수가 비어있거나 0인 행은 항상 먼저 포함합니다.
+    - 다음 갱신 시각이 지난 행은 (투표에 뽑힐 가능성 × 밀린 정도) 순으로 예산 안에서 고릅니다.
+    비용은 통계 조회(50개당 1 unit)와 채널 ID API 조회(needs_lookup(link)가 True인 행당 1 unit)로 추정합니다.
+    df에는 youtube_link 컬럼이 있어야 합니다.
+    """
+    now = time.time() if now is None else now
+    if needs_lookup is None:
+        needs_lookup = lambda link: "/channel/" not in link
+
+    missing = []
+    due = []
+    for idx, row in df.iterrows():
+        subscribers = row.get("youtube_subscribers")
+        if pd.isna(subscribers) or subscribers == 0:
+            missing.append(idx)
+            continue
+        if not row.get("youtube_link"):
+            continue
+        next_refresh = row.get(NEXT_REFRESH_COLUMN)
+        if pd.isna(next_refresh):
+            # 갱신 상태가 없는 기존 행은 지금 바로 갱신 대상으로 봅니다.
+            overdue = 1.0
+        elif next_refresh > now:
+            continue
+        else:
+            overdue = 1.0 + (now - next_refresh) / refresh_interval(subscribers, row.get(VOLATILITY_COLUMN))
+        due.append((poll_weight(row) * overdue, idx))
+    due.sort(key=lambda item: -item[0])
+
+    selected = []
+    lookups = 0
+    with_link = 0
+    for idx in missing + [idx for _, idx in due]:
+        link = df.at[idx, "youtube_link"]
+        add_lookup = 1 if link and needs_lookup(link) else 0
+        add_link = 1 if link else 0
+        cost = lookups + add_lookup + math.ceil((with_link + add_link) / STATS_BATCH_SIZE)
+        if budget is not None and cost > budget:
+            continue
+        lookups += add_lookup
+        with_link += add_link
+        selected.append(idx)
+    return selected
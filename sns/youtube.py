@@ -3,10 +3,93 @@ import random
 import re
 from math import ceil
 import requests
-from bs4 import BeautifulSoup
 import re
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from urllib.parse import unquote
+from zoneinfo import ZoneInfo
+from crawler.fetch import get_session
+from sns.artist_index import ArtistIndex, normalize_name
 
-def process_batch_requests(youtube, requests):
+# YouTube URL → 채널 ID 영구 캐시 파일
+CHANNEL_CACHE_FILE = "youtube_channel_cache.json"
+# 날짜별 YouTube Data API 사용량(unit) 기록 파일
+QUOTA_USAGE_FILE = "youtube_quota_usage.json"
+# YouTube Data API 할당량은 태평양 시간 자정에 초기화됩니다.
+QUOTA_TIMEZONE = ZoneInfo("America/Los_Angeles")
+
+# 채널 페이지에서 채널 ID를 담고 있는 태그: <link rel="canonical">, <meta itemprop="channelId|identifier">
+CHANNEL_ID_PATTERNS = [
+    re.compile(rb'<link[^>]*?rel="canonical"[^>]*?href="[^"]*?/channel/([^/?"]+)'),
+    re.compile(rb'<link[^>]*?href="[^"]*?/channel/([^/?"]+)[^"]*"[^>]*?rel="canonical"'),
+    re.compile(rb'<meta[^>]*?itemprop="(?:channelId|identifier)"[^>]*?content="(UC[\w-]+)"'),
+]
+STREAM_CHUNK_SIZE = 16 * 1024
+STREAM_OVERLAP = 1024
+# 채널 ID를 찾은 뒤 남은 본문이 이만큼 이하이면 끝까지 읽어 연결을 세션 풀로 돌려보냄
+STREAM_DRAIN_LIMIT = 64 * 1024
+
+# YouTube Data API: channels.list 호출 1회 비용(unit)과 배치 HTTP 요청 하나에 담는 최대 호출 수
+QUOTA_COST_CHANNELS_LIST = 1
+MAX_BATCH_REQUESTS = 50
+
+# 플레이리스트(차트) 트랙 목록 캐시 유지 시간(초)
+PLAYLIST_TTL = 6 * 3600
+
+def quota_day(now=None):
+    """할당량 기준 날짜(태평양 시간, YYYY-MM-DD)를 반환합니다."""
+    now = time.time() if now is None else now
+    return datetime.fromtimestamp(now, QUOTA_TIMEZONE).strftime("%Y-%m-%d")
+
+class QuotaTracker:
+    """
+    YouTube Data API 사용량(unit)을 집계합니다.
+    daily_limit이 주어지면 한도를 넘는 요청은 charge()가 False를 반환해 보내지 않게 합니다.
+    usage_file이 주어지면 오늘(태평양 시간 기준) 이미 쓴 사용량을 불러와 이어서 세고,
+    save()로 다시 기록합니다. 같은 날 여러 번 실행해도 합계가 daily_limit을 넘지 않습니다.
+    """
+    def __init__(self, daily_limit=None, usage_file=None):
+        self.daily_limit = daily_limit
+        self.usage_file = usage_file
+        self.day = quota_day()
+        self.used = 0
+        if usage_file:
+            try:
+                with open(usage_file, encoding="utf-8") as f:
+                    usage = json.load(f)
+                self.used = int(usage.get(self.day, 0))
+            except (OSError, ValueError, AttributeError):
+                pass
+
+    @property
+    def remaining(self):
+        return None if self.daily_limit is None else max(0, self.daily_limit - self.used)
+
+    def charge(self, units):
+        if self.daily_limit is not None and self.used + units > self.daily_limit:
+            return False
+        self.used += units
+        return True
+
+    def save(self):
+        # 오늘 사용량만 남기고 지난 날짜 기록은 지웁니다.
+        if not self.usage_file:
+            return
+        tmp_path = f"{self.usage_file}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({self.day: self.used}, f)
+        os.replace(tmp_path, self.usage_file)
+
+def process_batch_requests(youtube, requests, quota=None, cost=QUOTA_COST_CHANNELS_LIST):
+    """
+    {request_id: API 요청} 들을 배치 HTTP 요청으로 묶어 실행합니다.
+    MAX_BATCH_REQUESTS개씩 한 번의 왕복으로 보내며, quota가 주어지면 요청당 cost unit을
+    차감하고 한도를 넘는 요청은 보내지 않습니다(결과에서 빠짐).
+    """
     if not requests:
         return {}
     
@@ -18,10 +101,18 @@ def process_batch_requests(youtube, requests):
         else:
             results[request_id] = response
 
-    batch = youtube.new_batch_http_request(callback=callback)
-    for req_id, request in requests.items():
-        batch.add(request, request_id=req_id)
-    batch.execute()
+    items = list(requests.items())
+    for i in range(0, len(items), MAX_BATCH_REQUESTS):
+        batch = youtube.new_batch_http_request(callback=callback)
+        added = 0
+        for req_id, request in items[i:i + MAX_BATCH_REQUESTS]:
+            if quota is not None and not quota.charge(cost):
+                print(f"API 할당량 부족으로 요청을 건너뜁니다: {req_id}")
+                continue
+            batch.add(request, request_id=req_id)
+            added += 1
+        if added:
+            batch.execute()
     return results
 
 CHANNEL_PATTERN = re.compile(r'(?:https?://)?(?:www\.)?youtube\.com/channel/([^/?]+)')
@@ -34,27 +125,67 @@ def is_valid_youtube_url(url):
         url
     ))
 
-def get_youtube_channel_id(url, timeout=10):
-    headers = {"User-Agent": "Mozilla/5.0"}
-    CHANNEL_PATTERN = re.compile(r'/channel/([^/?]+)')
-
+def resolve_channel_id(url, timeout=10, session=None):
+    """
+    URL에서 채널 ID를 찾습니다. 페이지를 받았지만 찾지 못하면 None을 반환하고,
+    네트워크 오류는 requests.RequestException으로 그대로 올립니다.
+    """
     if not url or not is_valid_youtube_url(url):
         print(f"Invalid URL format: {url}")
         return None
 
-    try:
-        match = CHANNEL_PATTERN.search(url)
-        if match:
-            return match.group(1)
+    match = CHANNEL_PATTERN.search(url)
+    if match:
+        return match.group(1)
 
-        response = requests.get(url, headers=headers, timeout=timeout)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.text, 'html.parser')
-        canonical_link = soup.find("link", rel="canonical")
-        if canonical_link and 'href' in canonical_link.attrs:
-            match = CHANNEL_PATTERN.search(canonical_link['href'])
+    return fetch_channel_id(url, timeout=timeout, session=session)
+
+def extract_channel_id_stream(chunks):
+    """
+    HTML 바이트 청크를 차례로 검사해 canonical 링크나 channelId meta 값을 찾는 즉시
+    채널 ID를 반환합니다. 청크 경계에 걸친 태그도 찾도록 앞 청크의 끝부분을 겹쳐 봅니다.
+    끝까지 찾지 못하면 None을 반환합니다.
+    """
+    buffer = b""
+    for chunk in chunks:
+        buffer = buffer[-STREAM_OVERLAP:] + chunk
+        for pattern in CHANNEL_ID_PATTERNS:
+            match = pattern.search(buffer)
             if match:
-                return match.group(1)
+                return match.group(1).decode("ascii")
+    return None
+
+def drain_response(response, limit=STREAM_DRAIN_LIMIT):
+    """
+    남은 본문을 limit 바이트까지 읽습니다. 그 안에 끝나면 True를 반환하며,
+    이 경우 응답을 닫아도 연결이 세션의 keep-alive 풀로 돌아갑니다.
+    """
+    read = 0
+    for chunk in response.iter_content(chunk_size=STREAM_CHUNK_SIZE):
+        read += len(chunk)
+        if read > limit:
+            return False
+    return True
+
+def fetch_channel_id(url, timeout=10, session=None):
+    """
+    채널 페이지를 스트리밍으로 읽다가 채널 ID를 찾으면 바로 연결을 닫습니다.
+    (수 MB짜리 페이지 전체를 받거나 DOM을 만들지 않음)
+    다 읽지 않은 응답을 닫으면 그 연결은 버려지므로 세션의 keep-alive 연결을 재사용하지 못합니다.
+    남은 본문이 STREAM_DRAIN_LIMIT 이하일 때만 끝까지 읽어 연결을 살리고, 그보다 크면
+    나머지를 받는 것보다 새 연결을 맺는 편이 싸므로 그대로 닫습니다.
+    """
+    headers = {"User-Agent": "Mozilla/5.0"}
+    with (session or requests).get(url, headers=headers, timeout=timeout, stream=True) as response:
+        response.raise_for_status()
+        channel_id = extract_channel_id_stream(response.iter_content(chunk_size=STREAM_CHUNK_SIZE))
+        if channel_id is not None:
+            drain_response(response)
+        return channel_id
+
+def get_youtube_channel_id(url, timeout=10, session=None):
+    try:
+        return resolve_channel_id(url, timeout=timeout, session=session)
     except requests.RequestException as e:
         print(f"Request error ({url}): {e}")
     except Exception as e:
@@ -62,36 +193,164 @@ def get_youtube_channel_id(url, timeout=10):
     
     return None
 
-def get_youtube_channel_ids(youtube_links):
+class ChannelIdCache:
+    """
+    YouTube URL → 채널 ID 매핑을 JSON 파일에 보관합니다.
+    - 찾은 채널 ID는 ttl초 동안 재사용합니다.
+    - 찾지 못한 결과(None)도 negative_ttl초 동안 기억해 같은 페이지를 반복해서 받지 않습니다.
+    네트워크 오류로 실패한 URL은 저장하지 않습니다.
+    """
+    def __init__(self, path=CHANNEL_CACHE_FILE, ttl=90 * 24 * 3600, negative_ttl=3 * 24 * 3600):
+        self.path = path
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.lock = threading.Lock()
+        try:
+            with open(path, encoding="utf-8") as f:
+                self.entries = json.load(f)
+        except (OSError, ValueError):
+            self.entries = {}
+
+    def get(self, url):
+        """(적중 여부, 채널 ID 또는 None)을 반환합니다."""
+        entry = self.entries.get(url)
+        if entry is None:
+            return False, None
+        ttl = self.ttl if entry.get("id") else self.negative_ttl
+        if time.time() - entry.get("ts", 0) > ttl:
+            return False, None
+        return True, entry.get("id")
+
+    def set(self, url, channel_id):
+        with self.lock:
+            self.entries[url] = {"id": channel_id, "ts": time.time()}
+
+    def save(self):
+        with self.lock:
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self.entries, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+
+def api_lookup_params(url):
+    """@handle, /user/ URL이면 channels.list 조회 인자(forHandle/forUsername)를, 아니면 None을 반환합니다."""
+    match = HANDLE_PATTERN.search(url)
+    if match:
+        return {"forHandle": "@" + unquote(match.group(1))}
+    match = USER_PATTERN.search(url)
+    if match:
+        return {"forUsername": unquote(match.group(1))}
+    return None
+
+def resolve_channel_ids_api(youtube, urls, quota=None):
+    """
+    @handle, /user/ URL의 채널 ID를 channels.list(forHandle/forUsername)로 조회합니다.
+    요청은 배치 HTTP 요청으로 묶어 보내며, 채널 ID를 찾은 URL만 {url: 채널 ID}로 반환합니다.
+    """
+    requests_by_id = {}
+    for i, url in enumerate(urls):
+        params = api_lookup_params(url)
+        if params:
+            requests_by_id[str(i)] = youtube.channels().list(part="id", maxResults=1, **params)
+
+    resolved = {}
+    for req_id, response in process_batch_requests(youtube, requests_by_id, quota=quota).items():
+        url = urls[int(req_id)]
+        if "exception" in response:
+            print(f"API error ({url}): {response['exception']}")
+            continue
+        items = response.get("items") or []
+        if items and items[0].get("id"):
+            resolved[url] = items[0]["id"]
+    return resolved
+
+def get_youtube_channel_ids(youtube_links, workers=8, cache_file=CHANNEL_CACHE_FILE, youtube=None, quota=None):
+    """
+    여러 YouTube URL의 채널 ID를 조회합니다.
+    /channel/ URL은 바로 추출하고, 캐시에 없는 @handle, /user/ URL은 youtube 클라이언트가 주어지면
+    먼저 API 배치 요청으로 찾습니다. 나머지(/c/ URL, API로 찾지 못한 URL)만
+    workers개의 스레드로 동시에 페이지를 받아 확인합니다. cache_file=None이면 캐시를 쓰지 않습니다.
+    """
+    cache = ChannelIdCache(cache_file) if cache_file else None
     channel_ids_mapping = {}
+    to_resolve = []
+    pending = set()
     for url in youtube_links:
+        if url in channel_ids_mapping or url in pending:
+            continue
         if not url:
             channel_ids_mapping[url] = None
             continue
+        if cache is not None:
+            hit, channel_id = cache.get(url)
+            if hit:
+                channel_ids_mapping[url] = channel_id
+                continue
+        match = CHANNEL_PATTERN.search(url)
+        if match:
+            channel_ids_mapping[url] = match.group(1)
+            continue
+        pending.add(url)
+        to_resolve.append(url)
+
+    print(f"채널 ID: 캐시/URL에서 {len(channel_ids_mapping)}개 확인, 새로 조회 {len(to_resolve)}개")
+
+    if youtube is not None and to_resolve:
+        api_urls = [url for url in to_resolve if is_valid_youtube_url(url) and api_lookup_params(url)]
+        resolved = resolve_channel_ids_api(youtube, api_urls, quota=quota)
+        for url, channel_id in resolved.items():
+            channel_ids_mapping[url] = channel_id
+            if cache is not None:
+                cache.set(url, channel_id)
+        to_resolve = [url for url in to_resolve if url not in resolved]
+        print(f"채널 ID: API로 {len(resolved)}개 확인, 페이지 조회 {len(to_resolve)}개")
 
-        channel_id = get_youtube_channel_id(url)
-        channel_ids_mapping[url] = channel_id
+    def resolve(url):
+        try:
+            return url, resolve_channel_id(url, session=get_session()), True
+        except requests.RequestException as e:
+            print(f"Request error ({url}): {e}")
+        except Exception as e:
+            print(f"Parsing error ({url}): {e}")
+        return url, None, False
+
+    if to_resolve:
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            for url, channel_id, definitive in executor.map(resolve, to_resolve):
+                channel_ids_mapping[url] = channel_id
+                if cache is not None and definitive:
+                    cache.set(url, channel_id)
+    if cache is not None:
+        cache.save()
 
     return channel_ids_mapping
 
-def get_youtube_stats_batch(youtube, channel_ids):
-    from math import ceil
+def get_youtube_stats_batch(youtube, channel_ids, quota=None):
+    """
+    채널 ID들의 구독자/조회수/동영상 수를 조회합니다.
+    50개씩 나눈 channels.list 호출을 배치 HTTP 요청 하나로 묶어 보냅니다.
+    """
     stats_results = {}
     if not channel_ids:
         return stats_results
 
-    # None이 아니면서 문자열인 채널 ID만 필터링
-    valid_ids = [cid for cid in channel_ids if cid and isinstance(cid, str)]
+    # None이 아니면서 문자열인 채널 ID만 중복 없이 필터링
+    valid_ids = list(dict.fromkeys(cid for cid in channel_ids if cid and isinstance(cid, str)))
     if not valid_ids:
         return stats_results
 
     batch_size = 50
-    num_batches = ceil(len(valid_ids) / batch_size)
-    
-    for i in range(num_batches):
+    requests_by_id = {}
+    for i in range(ceil(len(valid_ids) / batch_size)):
         batch_ids = valid_ids[i * batch_size:(i + 1) * batch_size]
-        request = youtube.channels().list(id=",".join(batch_ids), part="statistics")
-        response = request.execute()
+        requests_by_id[str(i)] = youtube.channels().list(
+            id=",".join(batch_ids), part="statistics", maxResults=batch_size
+        )
+
+    for req_id, response in process_batch_requests(youtube, requests_by_id, quota=quota).items():
+        if "exception" in response:
+            print(f"API error (stats batch {req_id}): {response['exception']}")
+            continue
         for item in response.get("items", []):
             cid = item.get("id")
             stats = item.get("statistics", {})
@@ -105,45 +364,82 @@ def get_youtube_stats_batch(youtube, channel_ids):
     return stats_results
 
 
-def get_playlist(playlist_url):
-    def extract_playlist_id(url):
-        match = re.search(r"[?&]list=([a-zA-Z0-9_-]+)", url)
-        return match.group(1) if match else None
+_ytmusic = None
+_playlist_cache = {}
+# _playlist_lock은 캐시 조회/기록과 ID별 잠금 목록만 잠깐 잡고, 네트워크 요청은 ID별 잠금 안에서 합니다.
+_playlist_lock = threading.Lock()
+_playlist_fetch_locks = {}
+
+def get_ytmusic():
+    # YTMusic 클라이언트는 프로세스에서 하나만 만들어 재사용합니다.
+    global _ytmusic
+    with _playlist_lock:
+        if _ytmusic is None:
+            _ytmusic = YTMusic()
+        return _ytmusic
+
+def extract_playlist_id(url):
+    match = re.search(r"[?&]list=([a-zA-Z0-9_-]+)", url)
+    return match.group(1) if match else None
 
-    ytm = YTMusic()
+def get_playlist_entry(playlist_url, ttl=PLAYLIST_TTL, refresh=False):
+    """
+    플레이리스트를 (playlist_id, 받은 시각, 트랙 목록)으로 반환합니다.
+    플레이리스트 ID별로 ttl초 동안 프로세스 메모리에 캐시하며, refresh=True면 바로 다시 받습니다.
+    받은 시각은 트랙 목록에서 파생한 캐시(매칭 결과 등)의 키로 씁니다.
+    """
     playlist_id = extract_playlist_id(playlist_url)
     if not playlist_id:
         raise ValueError("Invalid playlist URL.")
-    
-    playlist_info = ytm.get_playlist(playlist_id)
 
-    tracks = playlist_info.get('tracks', [])
-    if not tracks:
-        raise ValueError("No tracks found in playlist.")
-    
-    return tracks
+    requested_at = time.time()
+    with _playlist_lock:
+        cached = _playlist_cache.get(playlist_id)
+        if cached and not refresh and requested_at - cached[0] < ttl:
+            return (playlist_id,) + cached
+        fetch_lock = _playlist_fetch_locks.setdefault(playlist_id, threading.Lock())
 
-import random
+    # 같은 플레이리스트는 한 번만 받도록 ID별로 잠급니다. (다른 플레이리스트 조회는 기다리지 않음)
+    with fetch_lock:
+        with _playlist_lock:
+            cached = _playlist_cache.get(playlist_id)
+        # 기다리는 동안 다른 세션이 새로 받아 두었으면 그 결과를 씁니다.
+        if cached and cached[0] >= requested_at:
+            return (playlist_id,) + cached
 
-def get_random_track_from_playlist(data, tracks, max_attempts=20):
-    attempt = 0
-    while attempt < max_attempts:
-        selected_track = random.choice(tracks)
-        track_artist = [artist.get('name') for artist in selected_track.get('artists', [])][0]
-        print(f"Selected track: {selected_track.get('title')} by {track_artist}")
-
-        matched_groups = data[data['group_name'].str.lower().str.contains(track_artist.lower(), case=False, na=False)]
-
-        if not matched_groups.empty:
-            matched_group_info = matched_groups.iloc[0].to_dict()
-            matched_group_info["song_title"] = selected_track.get('title')
-            matched_group_info["videoId"] = selected_track.get('videoId')
-            matched_group_info["artists"] = track_artist
-            matched_group_info["song_thumbnail"] = selected_track.get('thumbnails', [{}])[0].get('url', '').split("/sddefault.jpg")[0] + "/maxresdefault.jpg"
-            return matched_group_info
-        
-        attempt += 1
+        playlist_info = get_ytmusic().get_playlist(playlist_id)
+        tracks = playlist_info.get('tracks', [])
+        if not tracks:
+            raise ValueError("No tracks found in playlist.")
+        entry = (time.time(), tracks)
+        with _playlist_lock:
+            _playlist_cache[playlist_id] = entry
+        return (playlist_id,) + entry
 
-    return None
+def get_playlist(playlist_url, ttl=PLAYLIST_TTL, refresh=False):
+    """플레이리스트의 트랙 목록을 반환합니다. (get_playlist_entry 참고)"""
+    return get_playlist_entry(playlist_url, ttl, refresh)[2]
+
+def get_random_track_from_playlist(data, tracks, index=None, exclude=(), matched=None):
+    """
+    플레이리스트에서 data의 그룹과 아티스트가 맞는 트랙을 하나 무작위로 골라 그룹 정보와 함께 반환합니다.
+    모든 트랙을 ArtistIndex로 한 번에 미리 매칭해 두므로 맞지 않는 트랙을 뽑느라 시도를 낭비하지 않습니다.
+    index(ArtistIndex)와 matched(index.match_tracks(tracks) 결과)를 넘기면 재사용합니다.
+    exclude의 group_name에 매칭된 트랙은 고를 때 뺍니다. 맞는 트랙이 없으면 None.
+    """
+    index = ArtistIndex(data) if index is None else index
+    matched = index.match_tracks(tracks) if matched is None else matched
+    excluded = {normalize_name(name) for name in exclude}
+    candidates = [entry for entry in matched if index.names[entry[1]] not in excluded]
+    if not candidates:
+        return None
+    selected_track, position = random.choice(candidates)
+    track_artist = selected_track['artists'][0].get('name')
+    print(f"Selected track: {selected_track.get('title')} by {track_artist}")
 
-    
\ No newline at end of file
+    matched_group_info = index.df.iloc[position].to_dict()
+    matched_group_info["song_title"] = selected_track.get('title')
+    matched_group_info["videoId"] = selected_track.get('videoId')
+    matched_group_info["artists"] = track_artist
+    matched_group_info["song_thumbnail"] = selected_track.get('thumbnails', [{}])[0].get('url', '').split("/sddefault.jpg")[0] + "/maxresdefault.jpg"
+    return matched_group_info
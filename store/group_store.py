@@ -0,0 +1,234 @@
+import datetime
+import json
+import os
+import re
+import sqlite3
+
+import pandas as pd
+
+from store.serialize import LIST_COLUMNS, DICT_COLUMNS, encode_json, decode_column, read_csv
+
+# 그룹 스냅샷을 보관하는 SQLite 파일
+DEFAULT_STORE_FILE = "groups.db"
+
+# 파일 이름에 들어있는 스냅샷 시각 (예: groups_data_updated_20250430_155245.csv)
+TIMESTAMP_PATTERN = re.compile(r'_(\d{8}_\d{6})')
+# 이름에 시각이 없는 옛 CSV 스냅샷의 생성 시각 (가장 오래된 것으로 취급)
+LEGACY_CREATED_AT = "1970-01-01T00:00:00"
+
+SQL_TYPES = {"int": "INTEGER", "real": "REAL", "text": "TEXT", "list": "TEXT", "dict": "TEXT"}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT UNIQUE NOT NULL,
+    kind TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    row_count INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS snapshot_columns (
+    snapshot_id INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    type TEXT NOT NULL,
+    PRIMARY KEY (snapshot_id, position)
+);
+CREATE TABLE IF NOT EXISTS groups (
+    snapshot_id INTEGER NOT NULL,
+    row_idx INTEGER NOT NULL,
+    group_name TEXT,
+    link TEXT,
+    PRIMARY KEY (snapshot_id, row_idx)
+);
+CREATE INDEX IF NOT EXISTS groups_by_name ON groups (snapshot_id, group_name);
+CREATE INDEX IF NOT EXISTS groups_by_link ON groups (snapshot_id, link);
+"""
+
+def snapshot_kind(name):
+    """파일 이름으로 스냅샷 종류를 정합니다. (유튜브 정보가 있으면 updated, 아니면 groups)"""
+    return "updated" if "updated" in name else "groups"
+
+def column_type(name, series):
+    if name in LIST_COLUMNS:
+        return "list"
+    if name in DICT_COLUMNS:
+        return "dict"
+    if pd.api.types.is_bool_dtype(series):
+        return "int"
+    if pd.api.types.is_numeric_dtype(series):
+        values = series.dropna()
+        if values.empty or (values == values.round()).all():
+            return "int"
+        return "real"
+    return "text"
+
+def encode_value(value, kind):
+    if value is None or (not isinstance(value, (list, dict)) and pd.isna(value)):
+        return None
+    if kind in ("list", "dict"):
+        return encode_json(value)
+    if kind == "int":
+        return int(value)
+    if kind == "real":
+        return float(value)
+    return str(value)
+
+def decode_value(value, kind):
+    if value is None:
+        return None
+    if kind in ("list", "dict"):
+        return json.loads(value)
+    return value
+
+class GroupStore:
+    """
+    그룹 데이터 스냅샷을 SQLite 파일에 보관합니다.
+    - 스냅샷마다 컬럼 순서와 타입을 기록해 load()가 CSV와 같은 모양의 DataFrame을 돌려줍니다.
+    - 리스트 컬럼은 JSON으로 저장하고 읽을 때 리스트로 되돌립니다.
+    - group_name, link 인덱스로 스냅샷 안의 한 행을 바로 찾을 수 있습니다.
+    """
+    def __init__(self, path=DEFAULT_STORE_FILE):
+        self.path = path
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _group_columns(self):
+        return {row[1] for row in self.conn.execute("PRAGMA table_info(groups)")}
+
+    def snapshots(self, kind=None):
+        """스냅샷 목록을 최신순으로 반환합니다."""
+        query = "SELECT id, name, kind, created_at, row_count FROM snapshots"
+        params = ()
+        if kind:
+            query += " WHERE kind = ?"
+            params = (kind,)
+        query += " ORDER BY created_at DESC, id DESC"
+        keys = ["id", "name", "kind", "created_at", "row_count"]
+        return [dict(zip(keys, row)) for row in self.conn.execute(query, params)]
+
+    def snapshot_id(self, snapshot=None, kind="updated"):
+        """스냅샷 id 또는 이름을 id로 바꿉니다. None이면 kind의 최신 스냅샷입니다."""
+        if snapshot is None:
+            row = self.conn.execute(
+                "SELECT id FROM snapshots WHERE kind = ? ORDER BY created_at DESC, id DESC LIMIT 1", (kind,)
+            ).fetchone()
+        elif isinstance(snapshot, int):
+            row = self.conn.execute("SELECT id FROM snapshots WHERE id = ?", (snapshot,)).fetchone()
+        else:
+            row = self.conn.execute("SELECT id FROM snapshots WHERE name = ?", (snapshot,)).fetchone()
+        if row is None:
+            raise ValueError(f"스냅샷을 찾을 수 없습니다: {snapshot}")
+        return row[0]
+
+    def has_snapshot(self, name):
+        return self.conn.execute("SELECT 1 FROM snapshots WHERE name = ?", (name,)).fetchone() is not None
+
+    def save_snapshot(self, df, name, kind=None, created_at=None):
+        """
+        DataFrame을 새 스냅샷으로 저장하고 id를 반환합니다. 같은 이름이 있으면 교체합니다.
+        """
+        kind = kind or snapshot_kind(name)
+        created_at = created_at or datetime.datetime.now().isoformat(timespec="seconds")
+        types = {col: column_type(col, df[col]) for col in df.columns}
+        with self.conn:
+            if self.has_snapshot(name):
+                self._delete(self.snapshot_id(name))
+            existing = self._group_columns()
+            for col, kind_ in types.items():
+                if col not in existing:
+                    self.conn.execute(f'ALTER TABLE groups ADD COLUMN "{col}" {SQL_TYPES[kind_]}')
+            cur = self.conn.execute(
+                "INSERT INTO snapshots (name, kind, created_at, row_count) VALUES (?, ?, ?, ?)",
+                (name, kind, created_at, len(df))
+            )
+            snapshot_id = cur.lastrowid
+            self.conn.executemany(
+                "INSERT INTO snapshot_columns (snapshot_id, position, name, type) VALUES (?, ?, ?, ?)",
+                [(snapshot_id, i, col, types[col]) for i, col in enumerate(df.columns)]
+            )
+            columns = list(df.columns)
+            placeholders = ", ".join("?" for _ in range(len(columns) + 2))
+            names = ", ".join(f'"{col}"' for col in columns)
+            rows = (
+                [snapshot_id, row_idx] + [encode_value(value, types[col]) for col, value in zip(columns, values)]
+                for row_idx, values in enumerate(df.itertuples(index=False, name=None))
+            )
+            self.conn.executemany(
+                f"INSERT INTO groups (snapshot_id, row_idx, {names}) VALUES ({placeholders})", rows
+            )
+        return snapshot_id
+
+    def _delete(self, snapshot_id):
+        self.conn.execute("DELETE FROM groups WHERE snapshot_id = ?", (snapshot_id,))
+        self.conn.execute("DELETE FROM snapshot_columns WHERE snapshot_id = ?", (snapshot_id,))
+        self.conn.execute("DELETE FROM snapshots WHERE id = ?", (snapshot_id,))
+
+    def delete_snapshot(self, snapshot):
+        snapshot_id = self.snapshot_id(snapshot)
+        with self.conn:
+            self._delete(snapshot_id)
+
+    def import_csv(self, csv_path, kind=None):
+        """
+        CSV 스냅샷을 가져옵니다. 이미 같은 이름(파일명)의 스냅샷이 있으면 건너뜁니다.
+        생성 시각은 파일 이름의 시각을 사용하고, 시각이 없는 옛 파일(groups_data_updated.csv 등)은
+        LEGACY_CREATED_AT으로 두어 시각이 있는 스냅샷보다 항상 뒤에 정렬되게 합니다.
+        (파일 수정 시각은 clone 시점이라 순서를 정하는 데 쓸 수 없음)
+        """
+        name = os.path.basename(csv_path)
+        match = TIMESTAMP_PATTERN.search(name)
+        if match:
+            created_at = datetime.datetime.strptime(match.group(1), "%Y%m%d_%H%M%S").isoformat(timespec="seconds")
+        else:
+            created_at = LEGACY_CREATED_AT
+        if self.has_snapshot(name):
+            if not match:
+                # 예전 버전이 파일 수정 시각으로 가져온 스냅샷도 바로잡습니다.
+                with self.conn:
+                    self.conn.execute("UPDATE snapshots SET created_at = ? WHERE name = ?", (created_at, name))
+            return self.snapshot_id(name)
+        df = read_csv(csv_path)
+        return self.save_snapshot(df, name, kind=kind, created_at=created_at)
+
+    def _columns(self, snapshot_id):
+        return self.conn.execute(
+            "SELECT name, type FROM snapshot_columns WHERE snapshot_id = ? ORDER BY position", (snapshot_id,)
+        ).fetchall()
+
+    def load(self, snapshot=None, kind="updated"):
+        """스냅샷을 CSV와 같은 컬럼 순서의 DataFrame으로 읽습니다. (리스트 컬럼은 리스트)"""
+        snapshot_id = self.snapshot_id(snapshot, kind)
+        columns = self._columns(snapshot_id)
+        names = ", ".join(f'"{name}"' for name, _ in columns)
+        df = pd.read_sql_query(
+            f"SELECT {names} FROM groups WHERE snapshot_id = ? ORDER BY row_idx", self.conn, params=(snapshot_id,)
+        )
+        for name, kind_ in columns:
+            if kind_ in ("list", "dict"):
+                df[name] = decode_column(df[name])
+        return df
+
+    def find(self, group_name=None, link=None, snapshot=None, kind="updated"):
+        """group_name 또는 link로 스냅샷의 한 행을 찾아 dict로 반환합니다. 없으면 None."""
+        if group_name is None and link is None:
+            raise ValueError("group_name 또는 link가 필요합니다.")
+        snapshot_id = self.snapshot_id(snapshot, kind)
+        columns = self._columns(snapshot_id)
+        names = ", ".join(f'"{name}"' for name, _ in columns)
+        key, value = ("group_name", group_name) if group_name is not None else ("link", link)
+        row = self.conn.execute(
+            f"SELECT {names} FROM groups WHERE snapshot_id = ? AND {key} = ? ORDER BY row_idx LIMIT 1",
+            (snapshot_id, value)
+        ).fetchone()
+        if row is None:
+            return None
+        return {name: decode_value(v, kind_) for (name, kind_), v in zip(columns, row)}
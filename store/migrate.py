@@ -0,0 +1,48 @@
+"""
+예전 형식(파이썬 repr 문자열)으로 저장된 그룹 CSV의 리스트/딕셔너리 컬럼을 JSON으로 바꿉니다.
+이미 JSON인 값은 그대로 두므로 여러 번 실행해도 됩니다.
+
+    python -m store.migrate [CSV 파일 ...]
+"""
+import ast
+import glob
+import json
+import sys
+
+import pandas as pd
+
+from store.serialize import JSON_COLUMNS, encode_json, write_csv_atomic
+
+def to_python(value):
+    if not isinstance(value, str):
+        return None if pd.isna(value) else value
+    try:
+        return json.loads(value)
+    except ValueError:
+        return ast.literal_eval(value)
+
+def migrate_csv(path):
+    """path의 JSON 컬럼을 변환해 같은 파일에 저장하고, 바뀐 값의 수를 반환합니다."""
+    df = pd.read_csv(path)
+    changed = 0
+    for col in JSON_COLUMNS:
+        if col not in df.columns:
+            continue
+        values = [to_python(value) for value in df[col]]
+        changed += sum(
+            1 for old, new in zip(df[col], values)
+            if isinstance(old, str) and encode_json(new) != old
+        )
+        df[col] = pd.Series(values, index=df.index, dtype=object)
+    if changed:
+        write_csv_atomic(df, path)
+    return changed
+
+def main():
+    paths = sys.argv[1:] or sorted(glob.glob("groups_data*.csv"))
+    for path in paths:
+        changed = migrate_csv(path)
+        print(f"{path}: {changed}개 값을 JSON으로 변환했습니다.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+import json
+import os
+
+import pandas as pd
+
+# 리스트/딕셔너리 값을 가지는 컬럼. CSV와 DB에는 JSON 문자열로 저장합니다.
+LIST_COLUMNS = ["members_current", "members_former", "website", "sns", "sns_parsed", "youtube_videos"]
+DICT_COLUMNS = ["youtube_data"]
+JSON_COLUMNS = LIST_COLUMNS + DICT_COLUMNS
+
+def encode_json(value):
+    """리스트/딕셔너리 값을 JSON 문자열로 바꿉니다. 빈 값은 None입니다."""
+    if value is None or (not isinstance(value, (list, dict)) and pd.isna(value)):
+        return None
+    return json.dumps(value, ensure_ascii=False)
+
+def decode_column(values):
+    """
+    JSON 문자열 컬럼을 셀마다 json.loads로 풀어 값 목록을 반환합니다. 빈 값은 None입니다.
+    JSON이 아닌 셀이 있으면 몇 번째 행(0부터)인지 담아 ValueError를 냅니다.
+    """
+    decoded = []
+    for row, value in enumerate(values):
+        if value is None or (isinstance(value, float) and pd.isna(value)):
+            decoded.append(None)
+            continue
+        try:
+            decoded.append(json.loads(value))
+        except (TypeError, ValueError):
+            raise ValueError(f"{row}번째 행이 JSON 형식이 아닙니다: {str(value)[:80]!r}")
+    return decoded
+
+def decode_json_columns(df, source=""):
+    """df의 JSON 컬럼을 리스트/딕셔너리로 바꿉니다."""
+    for col in JSON_COLUMNS:
+        if col not in df.columns:
+            continue
+        if not pd.api.types.is_object_dtype(df[col]):
+            # 모두 비어있어 숫자(NaN) 컬럼으로 읽힌 경우
+            df[col] = pd.Series([None] * len(df), index=df.index, dtype=object)
+            continue
+        try:
+            df[col] = pd.Series(decode_column(df[col]), index=df.index, dtype=object)
+        except ValueError as e:
+            raise ValueError(
+                f"{source} '{col}' 컬럼의 {e} (예전 형식의 CSV라면 python -m store.migrate 로 먼저 변환하세요.)"
+            )
+    return df
+
+def read_csv(path):
+    """CSV를 읽고 리스트/딕셔너리 컬럼을 파이썬 값으로 되돌립니다."""
+    return decode_json_columns(pd.read_csv(path), source=path)
+
+def write_csv(df, path):
+    """리스트/딕셔너리 컬럼을 JSON으로 바꿔 CSV(UTF-8 BOM)로 저장합니다."""
+    out = df.copy()
+    for col in JSON_COLUMNS:
+        if col in out.columns:
+            out[col] = [encode_json(value) for value in out[col]]
+    out.to_csv(path, index=False, encoding="utf-8-sig")
+
+def write_csv_atomic(df, path):
+    # 임시 파일에 쓴 뒤 교체하여, 중간에 실패해도 기존 파일이 깨지지 않게 합니다.
+    tmp_path = f"{path}.tmp"
+    write_csv(df, tmp_path)
+    os.replace(tmp_path, path)